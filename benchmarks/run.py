@@ -0,0 +1,388 @@
+"""
+Benchmarks for the dashboard hot paths.
+
+Run with `python benchmarks/run.py --output results.json`, Qt runs offscreen unless `QT_QPA_PLATFORM` is already set.
+Compare two result files with `python benchmarks/run.py --compare old.json new.json`.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import PySide6
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QApplication
+
+from kevinbotlib_dashboard import __about__
+from kevinbotlib_dashboard.app import GridGraphicsView, WidgetGridController, WidgetItem
+from kevinbotlib_dashboard.formatting import FormatterCache
+from kevinbotlib_dashboard.processing import to_hierarchical_dict
+from kevinbotlib_dashboard.tree import DictTreeModel, TreeItem
+
+# Read when the application is created in `main`
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+Case = tuple[Callable[[], Any], Callable[[], Any] | None]
+"""The timed function and an untimed reset run before every repeat"""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    axis: str
+    """`topics` or `grid`"""
+    factory: Callable[[int], Case]
+    ops: Callable[[int], int] = lambda _size: 1
+    """Operations done by one run, used for per-operation times"""
+
+
+@dataclass
+class Result:
+    name: str
+    params: dict[str, int]
+    repeat: int
+    ops: int
+    times: list[float] = field(repr=False)
+    min: float = 0.0
+    median: float = 0.0
+    mean: float = 0.0
+    per_op: float = 0.0
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(axis: str, ops: Callable[[int], int] = lambda _size: 1):
+    def register(factory: Callable[[int], Case]):
+        BENCHMARKS.append(Benchmark(factory.__name__, axis, factory, ops))
+        return factory
+
+    return register
+
+
+def topic_keys(count: int, depth: int = 3, fanout: int = 10) -> list[str]:
+    keys = []
+    for index in range(count):
+        parts, remaining = ["bench"], index
+        for _ in range(depth):
+            remaining, digit = divmod(remaining, fanout)
+            parts.append(f"n{digit}")
+        parts.append(f"topic{index}")
+        keys.append("/".join(parts))
+    return keys
+
+
+def payload(value: float) -> dict:
+    return {
+        "timeout": None,
+        "value": value,
+        "did": "kevinbotlib.dtype.float",
+        "struct": {"dashboard": [{"element": "value", "format": "raw"}, {"element": "value", "format": "percent"}]},
+    }
+
+
+def formatted(count: int, generation: int = 0) -> dict[str, dict]:
+    return {key: {"value": f"{index + generation}"} for index, key in enumerate(topic_keys(count))}
+
+
+def build_all(item: TreeItem):
+    item.populate()
+    for child in item.child_items:
+        if not child.fetched:
+            build_all(child)
+
+
+def fill_grid(view: GridGraphicsView, controller: WidgetGridController, leave_free: int = 0) -> list[WidgetItem]:
+    """Fill the grid with 2x2 widgets, leaving the last `leave_free` slots empty"""
+    slots = [(x, y) for y in range(0, view.rows - 1, 2) for x in range(0, view.cols - 1, 2)]
+    items = []
+    for x, y in slots[: len(slots) - leave_free]:
+        item = WidgetItem("Bench", view, 2, 2)
+        controller.add_to_pos(item, x, y)
+        items.append(item)
+    return items
+
+
+def layout(size: int) -> list[dict]:
+    return [
+        {"pos": (x, y), "span_x": 2, "span_y": 2, "info": {}, "kind": "base", "title": f"Widget {x},{y}"}
+        for y in range(0, size - 1, 2)
+        for x in range(0, size - 1, 2)
+    ]
+
+
+@benchmark("topics")
+def to_hierarchical(count: int) -> Case:
+    flat = formatted(count)
+    return lambda: to_hierarchical_dict(flat), None
+
+
+@benchmark("topics")
+def tree_item_construction(count: int) -> Case:
+    hierarchy = to_hierarchical_dict(formatted(count))
+    return lambda: build_all(TreeItem(hierarchy)), None
+
+
+@benchmark("topics")
+def update_data_insert(count: int) -> Case:
+    hierarchy = to_hierarchical_dict(formatted(count))
+    model = DictTreeModel({})
+
+    def reset():
+        model.update_data({})
+
+    return lambda: model.update_data(hierarchy), reset
+
+
+@benchmark("topics")
+def update_data_changed(count: int) -> Case:
+    """Every tenth topic changed and the rest unchanged, with every folder already fetched"""
+    keys = topic_keys(count)
+    before = to_hierarchical_dict(formatted(count))
+    after = formatted(count)
+    for key in keys[::10]:
+        after[key] = {"value": "changed"}
+    after = to_hierarchical_dict(after)
+    model = DictTreeModel({})
+
+    def reset():
+        model.update_data(before)
+        for key in keys:
+            model.fetch_path(key)
+
+    return lambda: model.update_data(after), reset
+
+
+@benchmark("topics", ops=lambda count: count)
+def format_viewables(count: int) -> Case:
+    payloads = {key: payload(index / count) for index, key in enumerate(topic_keys(count))}
+    cache = FormatterCache()
+
+    def run():
+        for key, value in payloads.items():
+            cache.format(key, value)
+
+    return run, None
+
+
+@benchmark("grid", ops=lambda size: size * size)
+def is_valid_drop_position(size: int) -> Case:
+    view = GridGraphicsView(rows=size, cols=size)
+    controller = WidgetGridController(view)
+    fill_grid(view, controller, leave_free=1)
+    grid = view.grid_size
+    positions = [QPointF(x * grid, y * grid) for y in range(size) for x in range(size)]
+
+    def run():
+        for position in positions:
+            view.is_valid_drop_position(position, None, 2, 2)
+
+    return run, None
+
+
+@benchmark("grid")
+def controller_add_crowded(size: int) -> Case:
+    """Add a widget to a grid with only the last slot free"""
+    view = GridGraphicsView(rows=size, cols=size)
+    controller = WidgetGridController(view)
+    fill_grid(view, controller, leave_free=1)
+    added: list[WidgetItem] = []
+
+    def run():
+        item = WidgetItem("Bench", view, 2, 2)
+        controller.add(item)
+        added.append(item)
+
+    def reset():
+        while added:
+            controller.remove_widget(added.pop())
+
+    return run, reset
+
+
+@benchmark("grid", ops=lambda size: len(layout(size)))
+def controller_load(size: int) -> Case:
+    """Load a layout that fills the grid"""
+    view = GridGraphicsView(rows=size, cols=size)
+    controller = WidgetGridController(view)
+    items = layout(size)
+
+    def loader(item: dict) -> WidgetItem:
+        return WidgetItem(item["title"], view, item["span_x"], item["span_y"], item["info"])
+
+    return lambda: controller.load(loader, items), controller.clear
+
+
+@benchmark("grid", ops=lambda size: len(layout(size)))
+def layout_startup(size: int) -> Case:
+    """Load a layout that fills the grid into a 1080p window and paint the first frame"""
+    view = GridGraphicsView(rows=size, cols=size)
+    view.resize(1920, 1080)
+    view.show()
+    controller = WidgetGridController(view)
+    items = layout(size)
+    app = QApplication.instance()
+
+    def loader(item: dict) -> WidgetItem:
+        return WidgetItem(item["title"], view, item["span_x"], item["span_y"], item["info"])
+
+    def run():
+        controller.load(loader, items)
+        view.viewport().repaint()
+        app.processEvents()  # type: ignore
+
+    return run, controller.clear
+
+
+@benchmark("grid", ops=lambda size: len(layout(size)))
+def layout_snapshot(size: int) -> Case:
+    """GUI thread part of an autosave, serializing and writing happen in the saver thread"""
+    view = GridGraphicsView(rows=size, cols=size)
+    controller = WidgetGridController(view)
+    fill_grid(view, controller)
+    return controller.get_widgets, None
+
+
+@benchmark("grid", ops=lambda size: len(layout(size)))
+def paint_view(size: int) -> Case:
+    """Repaint a view showing a full grid, as during a drag across the whole layout"""
+    view = GridGraphicsView(rows=size, cols=size)
+    view.resize(size * view.grid_size + 4, size * view.grid_size + 4)
+    view.show()
+    fill_grid(view, WidgetGridController(view))
+
+    def reset():
+        view.viewport().repaint()
+
+    return view.viewport().repaint, reset
+
+
+@benchmark("grid", ops=lambda size: len(layout(size)))
+def paint_overview(size: int) -> Case:
+    """Step the zoom of a fixed-size view showing the whole grid, every widget is redrawn at the new scale"""
+    view = GridGraphicsView(rows=size, cols=size)
+    view.resize(800, 600)
+    view.show()
+    fill_grid(view, WidgetGridController(view))
+    fit = 600 / (size * view.grid_size)
+    zooms = itertools.cycle((fit, fit * 0.9))
+
+    def run():
+        view.set_zoom(next(zooms))
+        view.viewport().repaint()
+
+    return run, None
+
+
+def measure(bench: Benchmark, size: int, repeat: int, app: QApplication) -> Result:
+    run, reset = bench.factory(size)
+    times = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        app.processEvents()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    app.processEvents()
+
+    ops = bench.ops(size)
+    result = Result(bench.name, {bench.axis: size}, repeat, ops, times)
+    result.min = min(times)
+    result.median = statistics.median(times)
+    result.mean = statistics.fmean(times)
+    result.per_op = result.median / ops
+    return result
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": __about__.__version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> Iterator[Result]:
+    app = QApplication.instance() or QApplication([])
+    sizes = {"topics": args.topics, "grid": args.grid}
+    for bench in BENCHMARKS:
+        if args.filter and not any(pattern in bench.name for pattern in args.filter):
+            continue
+        for size in sizes[bench.axis]:
+            result = measure(bench, size, args.repeat, app)
+            print(
+                f"{bench.name:<26} {bench.axis}={size:<7} median {result.median * 1000:10.3f} ms"
+                f"  min {result.min * 1000:10.3f} ms  per op {result.per_op * 1e6:10.3f} us",
+                flush=True,
+            )
+            yield result
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Print the change of every benchmark present in both files, returns 1 if any slowed down past `threshold`"""
+    old = {
+        (result["name"], json.dumps(result["params"], sort_keys=True)): result
+        for result in json.loads(Path(old_path).read_text())["results"]
+    }
+    new = json.loads(Path(new_path).read_text())["results"]
+    regressed = False
+    for result in new:
+        previous = old.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if previous is None:
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else math.inf
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        regressed |= bool(flag)
+        print(f"{result['name']:<26} {result['params']!s:<16} {ratio:7.2f}x{flag}")
+    return 1 if regressed else 0
+
+
+def _sizes(value: str) -> list[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard hot paths")
+    parser.add_argument("--topics", type=_sizes, default=[100, 1000, 10000], help="Comma separated topic counts")
+    parser.add_argument("--grid", type=_sizes, default=[10, 30, 60], help="Comma separated grid sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", "--filter", action="append", help="Only run benchmarks whose name contains this")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown reported as a regression by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    results = list(run_benchmarks(args))
+    if args.output:
+        report = {"meta": metadata(), "results": [asdict(result) for result in results]}
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
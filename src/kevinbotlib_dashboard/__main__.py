@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: LGPL-3.0-or-later
 
+import cProfile
 import sys
 
 from kevinbotlib.logger import Level, Logger, LoggerConfiguration
@@ -10,6 +11,7 @@ from PySide6.QtWidgets import QApplication
 
 from kevinbotlib_dashboard import __about__
 from kevinbotlib_dashboard.app import Application
+from kevinbotlib_dashboard.tracing import tracer
 
 
 def run():
@@ -24,6 +26,27 @@ def run():
     parser.addOption(
         QCommandLineOption(["T", "trace"], QCoreApplication.translate("main", "Enable tracing (TRACE logging)"))
     )
+    parser.addOption(
+        QCommandLineOption(
+            ["r", "replay"],
+            QCoreApplication.translate("main", "Replay a telemetry log instead of connecting to a robot"),
+            "file",
+        )
+    )
+    parser.addOption(
+        QCommandLineOption(
+            ["profile"],
+            QCoreApplication.translate("main", "Write a cProfile of the session to <file> on exit"),
+            "file",
+        )
+    )
+    parser.addOption(
+        QCommandLineOption(
+            ["trace-events"],
+            QCoreApplication.translate("main", "Write Chrome/Perfetto trace events to <file> on exit"),
+            "file",
+        )
+    )
     parser.process(app)
 
     logger = Logger()
@@ -35,9 +58,26 @@ def run():
 
     logger.configure(LoggerConfiguration(level=log_level))
 
-    window = Application(app)
+    if parser.isSet("trace-events"):
+        tracer.start(parser.value("trace-events"))
+
+    profiler = None
+    if parser.isSet("profile"):
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    window = Application(app, parser.value("replay") or None)
     window.show()
-    sys.exit(app.exec())
+    code = app.exec()
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(parser.value("profile"))
+        logger.info(f"Profile written to {parser.value('profile')}")
+    if tracer.enabled:
+        tracer.stop()
+        logger.info(f"Trace events written to {tracer.path}")
+    sys.exit(code)
 
 
 if __name__ == "__main__":
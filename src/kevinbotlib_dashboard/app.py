@@ -1,5 +1,8 @@
 import functools
-from collections.abc import Callable
+import math
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from typing import override
 
 from kevinbotlib.comm import CommunicationClient, BaseSendable
@@ -8,22 +11,40 @@ from kevinbotlib.ui.theme import Theme, ThemeStyle
 
 from PySide6.QtCore import (
     QItemSelection,
+    QItemSelectionModel,
     QModelIndex,
     QObject,
+    QPoint,
     QPointF,
     QRect,
     QRectF,
     QRegularExpression,
     QSettings,
-    QSize,
+    QStringListModel,
     Qt,
     QTimer,
     Signal,
     Slot,
 )
-from PySide6.QtGui import QAction, QBrush, QCloseEvent, QColor, QPainter, QPen, QRegularExpressionValidator
+from PySide6.QtGui import (
+    QAction,
+    QBrush,
+    QCloseEvent,
+    QColor,
+    QKeySequence,
+    QMouseEvent,
+    QPainter,
+    QPen,
+    QPixmap,
+    QRegularExpressionValidator,
+    QResizeEvent,
+    QWheelEvent,
+)
 from PySide6.QtWidgets import (
+    QComboBox,
     QDialog,
+    QDoubleSpinBox,
+    QFileDialog,
     QFormLayout,
     QFrame,
     QGraphicsObject,
@@ -32,6 +53,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QListView,
     QMainWindow,
     QMenu,
     QMessageBox,
@@ -39,6 +61,7 @@ from PySide6.QtWidgets import (
     QSpinBox,
     QStackedWidget,
     QStyleOptionGraphicsItem,
+    QToolBar,
     QTreeView,
     QVBoxLayout,
     QWidget,
@@ -47,15 +70,36 @@ from PySide6.QtWidgets import (
     QApplication,
 )
 
+from kevinbotlib_dashboard import perf
+from kevinbotlib_dashboard.binding import WidgetBindings
+from kevinbotlib_dashboard.grid_theme import ThemePaint
 from kevinbotlib_dashboard.grid_theme import Themes as GridThemes
+from kevinbotlib_dashboard.history import TopicHistory
+from kevinbotlib_dashboard.layout import LayoutStore, default_layout_path, migrate_layout, write_layout
+from kevinbotlib_dashboard.monitoring import LatencyMonitor, Sparkline, TopicAges
+from kevinbotlib_dashboard.occupancy import OccupancyGrid
+from kevinbotlib_dashboard.processing import TopicDiff, TopicPipeline, TopicSnapshot
+from kevinbotlib_dashboard.recording import TelemetryRecorder
+from kevinbotlib_dashboard.registry import WidgetContext, kinds, load_kind
+from kevinbotlib_dashboard.replay import ReplayControls, ReplaySource
+from kevinbotlib_dashboard.search import TopicIndex
 from kevinbotlib_dashboard.toast import Notifier, Severity
+from kevinbotlib_dashboard.tracing import traced, tracer
 from kevinbotlib_dashboard.tree import DictTreeModel
+from kevinbotlib_dashboard.updates import FramePacer, TopicUpdateQueue
 from kevinbotlib_dashboard.widgets import Divider
 
 
 class WidgetItem(QGraphicsObject):
     item_deleted = Signal(object)
 
+    default_span = (1, 1)
+    """Span of new widgets added from the palette"""
+    detail_threshold = 0.5
+    """Below this level of detail the widget is drawn as plain blocks without text"""
+    follows_samples = False
+    """Notified for every received sample, not only when the topic's value changes"""
+
     def __init__(self, title: str, grid: "GridGraphicsView", span_x=1, span_y=1, data=None):
         if data is None:
             data = {}
@@ -63,6 +107,13 @@ class WidgetItem(QGraphicsObject):
 
         self.info = data
         self.kind = "base"
+        self.topic: str | None = self.info.get("topic")
+        """Topic the widget displays, if any"""
+        self.stale = False
+        self.culled = False
+        """Outside the viewport, bound topic changes are held back until it is visible again"""
+        self.detailed = True
+        """Whether the last paint was at full detail"""
 
         self.title = title
         self.grid_size = grid.grid_size
@@ -82,25 +133,52 @@ class WidgetItem(QGraphicsObject):
         self.min_height = self.grid_size * 2  # Minimum height in pixels
         self.view = grid
 
+        # The chrome only changes on resize and theme changes, moves and drags blit the cached pixmap
+        self.setCacheMode(QGraphicsObject.CacheMode.DeviceCoordinateCache)
+        self.layout_chrome()
+
+    @classmethod
+    def create(cls, context: WidgetContext, title: str, span_x: int, span_y: int, data: dict) -> "WidgetItem":
+        """Build a widget of this kind, used by the registry for layouts and the palette"""
+        return cls(title, context.view, span_x, span_y, data)
+
+    @classmethod
+    def topic_info(cls, key: str, _raw: dict) -> dict | None:
+        """Info of a new widget showing the topic `key` with the raw payload `raw`, `None` if it can't show it"""
+        return {"topic": key}
+
     def boundingRect(self):  # noqa: N802
         return QRectF(0, 0, self.width, self.height)
 
-    def paint(self, painter: QPainter, _option: QStyleOptionGraphicsItem, /, _widget: QWidget | None = None):  # type: ignore
-        painter.setBrush(QBrush(QColor(self.view.theme.value.item_background)))
+    def layout_chrome(self):
+        """Recompute the chrome geometry after the size changed"""
+        margin = self.margin
+        self.body_rect = QRect(margin, margin, self.width - 2 * margin, self.height - 2 * margin)
+        self.title_rect = QRect(margin, margin, self.width - 2 * margin, 30)
+        # Squares off the bottom corners of the title bar
+        self.title_fill_rect = QRect(margin, margin + 10, self.width - 2 * margin, 20)
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, /, _widget: QWidget | None = None):  # type: ignore
+        perf.stats.painted += 1
+        paint = self.view.theme_paint
         painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(
-            QRect(self.margin, self.margin, self.width - 2 * self.margin, self.height - 2 * self.margin), 10, 10
-        )
-
-        title_rect = QRect(self.margin, self.margin, self.width - 2 * self.margin, 30)
+        painter.setBrush(paint.item_brush)
+
+        self.detailed = option.levelOfDetailFromTransform(painter.worldTransform()) >= self.detail_threshold
+        if not self.detailed:
+            # Zoomed out, text would be unreadable and rounded corners invisible
+            painter.drawRect(self.body_rect)
+            painter.setBrush(paint.stale_title_brush if self.stale else paint.title_brush)
+            painter.drawRect(self.title_rect)
+            return
+        painter.drawRoundedRect(self.body_rect, 10, 10)
 
-        painter.setBrush(QBrush(QColor(self.view.theme.value.primary)))
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(title_rect, 10, 10)
-        painter.drawRect(QRect(title_rect.x(), title_rect.y() + 10, title_rect.width(), title_rect.height() - 10))
+        painter.setBrush(paint.stale_title_brush if self.stale else paint.title_brush)
+        painter.drawRoundedRect(self.title_rect, 10, 10)
+        painter.drawRect(self.title_fill_rect)
 
-        painter.setPen(QPen(QColor(self.view.theme.value.foreground)))
-        painter.drawText(title_rect, Qt.AlignmentFlag.AlignCenter, self.title)
+        painter.setPen(paint.text_pen)
+        painter.drawText(self.title_rect, Qt.AlignmentFlag.AlignCenter, self.title)
 
     @override
     def mousePressEvent(self, event):
@@ -120,6 +198,17 @@ class WidgetItem(QGraphicsObject):
             event.accept()
         else:
             super().mousePressEvent(event)
+            # Qt drags every selected widget along with this one
+            for item in self.moving_items():
+                item.start_pos = item.pos()
+
+    def moving_items(self) -> list["WidgetItem"]:
+        """Widgets moved by dragging this one"""
+        scene = self.scene()
+        items = [item for item in scene.selectedItems() if isinstance(item, WidgetItem)] if scene else []
+        if self not in items:
+            items.append(self)
+        return items
 
     @override
     def mouseMoveEvent(self, event):
@@ -143,6 +232,7 @@ class WidgetItem(QGraphicsObject):
                 self.span_x = new_span_x
                 self.span_y = new_span_y
                 self.prepareGeometryChange()
+                self.layout_chrome()
             self.view.update_highlight(self.pos(), self, new_span_x, new_span_y)
             event.accept()
         else:
@@ -160,29 +250,48 @@ class WidgetItem(QGraphicsObject):
             else:
                 self.setPos(self.start_pos)
                 self.set_span(*self.start_span)
-        elif self.view.is_valid_drop_position(self.pos(), self, self.span_x, self.span_y):
-            self.snap_to_grid()
+            self.view.place_widget(self)
         else:
-            self.setPos(self.start_pos)
+            self.view.drop_widgets(self.moving_items())
         self.view.hide_highlight()
 
     @override
     def hoverEnterEvent(self, event):
         self.hovering = True
-        self.update()
         super().hoverEnterEvent(event)
 
     @override
     def hoverLeaveEvent(self, event):
         self.hovering = False
-        self.update()
         super().hoverLeaveEvent(event)
 
+    def bound_keys(self) -> set[str]:
+        """Topics the widget displays, it is notified through `data_changed` when any of them changes"""
+        return set() if self.topic is None else {self.topic}
+
+    def value_rect(self) -> QRectF:
+        """Area below the title bar, the only part repainted when a bound topic changes"""
+        return QRectF(self.margin, self.margin + 30, self.width - 2 * self.margin, self.height - 2 * self.margin - 30)
+
+    def data_changed(self, _keys: set[str]):
+        if self.detailed:
+            self.update(self.value_rect())
+
+    def set_culled(self, culled: bool):
+        self.culled = culled
+
+    def set_stale(self, stale: bool):
+        if stale != self.stale:
+            self.stale = stale
+            self.update()
+
     def set_span(self, x, y):
+        self.prepareGeometryChange()
         self.span_x = x
         self.span_y = y
         self.width = self.grid_size * x
         self.height = self.grid_size * y
+        self.layout_chrome()
         self.update()
 
     def snap_to_grid(self):
@@ -207,19 +316,59 @@ class WidgetItem(QGraphicsObject):
         self.item_deleted.emit(self)
 
 
+class PlaceholderWidgetItem(WidgetItem):
+    """Stands in for a widget whose kind isn't installed, its kind and data are saved back unchanged"""
+
+    def __init__(self, kind: str, title: str, grid: "GridGraphicsView", span_x=1, span_y=1, data=None):
+        super().__init__(title, grid, span_x, span_y, data)
+        self.kind = kind
+
+    @override
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, /, widget: QWidget | None = None):  # type: ignore
+        super().paint(painter, option, widget)
+        if not self.detailed:
+            return
+        painter.setPen(self.view.theme_paint.text_pen)
+        painter.drawText(
+            self.value_rect(),
+            Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap,
+            f"Unknown widget kind {self.kind!r}",
+        )
+
+
 class GridGraphicsView(QGraphicsView):
+    layout_changed = Signal()
+    """A widget was added, moved, resized or removed"""
+    viewport_changed = Signal()
+    """The visible part of the grid may have changed"""
+
+    min_zoom = 0.05
+    max_zoom = 4.0
+    min_grid_line_spacing = 6
+    """Grid lines are left out below this cell size in device pixels"""
+
     def __init__(self, parent=None, grid_size: int = 48, rows=10, cols=10, theme: GridThemes = GridThemes.Dark):
         super().__init__(parent)
         self.grid_size = grid_size
         self.rows, self.cols = rows, cols
         self.theme = theme
+        self.theme_paint = ThemePaint(theme.value)
 
         self.setScene(QGraphicsScene(self))
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
-        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate)
-        self.setBackgroundBrush(QColor(theme.value.background))
-
-        self.grid_lines = []
+        # Plots repaint their own region many times per second, those regions shouldn't be merged into one rect
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setBackgroundBrush(self.theme_paint.background)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self._pan_origin: QPoint | None = None
+
+        self.occupancy = OccupancyGrid(rows, cols)
+        """Cells covered by each widget, kept up to date by `WidgetGridController` and the widgets themselves"""
+        self.bindings = WidgetBindings(parent=self)
+        """Topics of the widgets on the grid, kept up to date by `WidgetGridController`"""
+
+        self._grid_tile: QPixmap | None = None
+        self._grid_tile_key: tuple | None = None
         self.draw_grid()
 
         self.highlight_rect = self.scene().addRect(
@@ -228,63 +377,191 @@ class GridGraphicsView(QGraphicsView):
         self.highlight_rect.setZValue(3)
         self.highlight_rect.hide()
 
+        self.viewport_changed.connect(self.update_culling)
+        self.layout_changed.connect(self.update_culling)
+
     def set_theme(self, theme: GridThemes):
         self.theme = theme
-        self.setBackgroundBrush(QColor(theme.value.background))
-        self.update()
+        self.theme_paint = ThemePaint(theme.value)
+        self.setBackgroundBrush(self.theme_paint.background)
+        self.draw_grid()
+        # Cached chrome has to be redrawn in the new colors
+        for item in self.scene().items():
+            if isinstance(item, WidgetItem):
+                item.update()
 
-    def is_valid_drop_position(self, position, dragging_widget=None, span_x=1, span_y=1):
+    @override
+    def drawBackground(self, painter: QPainter, rect: QRectF):
+        super().drawBackground(painter, rect)
         grid_size = self.grid_size
-        rows, cols = self.rows, self.cols
-        new_x = round(position.x() / grid_size) * grid_size
-        new_y = round(position.y() / grid_size) * grid_size
-        new_x = max(0, min(new_x, (cols - span_x) * grid_size))
-        new_y = max(0, min(new_y, (rows - span_y) * grid_size))
-        if new_x + span_x * grid_size > cols * grid_size or new_y + span_y * grid_size > rows * grid_size:
-            return False
-        bounding_rect = QRectF(QPointF(new_x, new_y), QSize(span_x * grid_size, span_y * grid_size))
-        items = self.scene().items(bounding_rect)
-        return all(not (isinstance(item, WidgetItem) and item != dragging_widget) for item in items)
+        exposed = rect.intersected(QRectF(0, 0, self.cols * grid_size, self.rows * grid_size))
+        if exposed.isEmpty():
+            return
+        scale = painter.worldTransform().m11() * painter.device().devicePixelRatioF()
+        if grid_size * scale < self.min_grid_line_spacing:
+            # The lines would blend into a flat fill when zoomed far out
+            return
+        tile = self.grid_tile(scale)
+        painter.drawTiledPixmap(exposed, tile, QPointF(exposed.x() % grid_size, exposed.y() % grid_size))
+
+    def grid_tile(self, scale: float) -> QPixmap:
+        """One cell of the grid lines, rendered for the device pixels of the current zoom"""
+        size = max(1, round(self.grid_size * scale))
+        key = (self.grid_size, self.theme_paint.grid_pen.color().rgba(), size)
+        if self._grid_tile is None or self._grid_tile_key != key:
+            tile = QPixmap(size, size)
+            # Logical size of exactly one cell so tiles line up at any zoom
+            tile.setDevicePixelRatio(size / self.grid_size)
+            tile.fill(Qt.GlobalColor.transparent)
+
+            painter = QPainter(tile)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(self.theme_paint.grid_pen)
+            # Lines sit on the cell edges, every tile draws its half of the lines on all four sides
+            for edge in (0, self.grid_size):
+                painter.drawLine(QPointF(edge, 0), QPointF(edge, self.grid_size))
+                painter.drawLine(QPointF(0, edge), QPointF(self.grid_size, edge))
+            painter.end()
+
+            self._grid_tile, self._grid_tile_key = tile, key
+        return self._grid_tile
+
+    @override
+    def paintEvent(self, event):
+        perf.stats.painted = 0
+        started = time.perf_counter()
+        super().paintEvent(event)
+        perf.stats.record_span("paint", started, time.perf_counter())
+        perf.stats.record("repainted", perf.stats.painted)
+        tracer.counter("repainted", {"items": perf.stats.painted})
+
+    def snap_cell(self, position: QPointF, span_x=1, span_y=1) -> tuple[int, int]:
+        """Column and row nearest to a scene position, clamped so the span stays inside the grid"""
+        col = max(0, min(round(position.x() / self.grid_size), self.cols - span_x))
+        row = max(0, min(round(position.y() / self.grid_size), self.rows - span_y))
+        return col, row
+
+    def is_valid_drop_position(self, position, dragging_widget=None, span_x=1, span_y=1):
+        col, row = self.snap_cell(position, span_x, span_y)
+        return self.occupancy.is_free(col, row, span_x, span_y, dragging_widget)
 
     def update_highlight(self, position, dragging_widget=None, span_x=1, span_y=1):
         grid_size = self.grid_size
-        rows, cols = self.rows, self.cols
-        new_x = round(position.x() / grid_size) * grid_size
-        new_y = round(position.y() / grid_size) * grid_size
-        new_x = max(0, min(new_x, (cols - span_x) * grid_size))
-        new_y = max(0, min(new_y, (rows - span_y) * grid_size))
-        valid_position = self.is_valid_drop_position(position, dragging_widget, span_x, span_y)
+        col, row = self.snap_cell(position, span_x, span_y)
+        valid_position = self.occupancy.is_free(col, row, span_x, span_y, dragging_widget)
         self.highlight_rect.setBrush(QBrush(QColor(0, 255, 0, 100) if valid_position else QColor(255, 0, 0, 100)))
-        self.highlight_rect.setRect(new_x, new_y, grid_size * span_x, grid_size * span_y)
+        self.highlight_rect.setRect(col * grid_size, row * grid_size, grid_size * span_x, grid_size * span_y)
         self.highlight_rect.show()
 
+    def place_widget(self, item: WidgetItem):
+        """Record the cells a widget covers after it was added, moved or resized"""
+        col, row = self.snap_cell(item.pos(), item.span_x, item.span_y)
+        if self.occupancy.rect(item) != (col, row, item.span_x, item.span_y):
+            self.occupancy.place(item, col, row, item.span_x, item.span_y)
+            self.layout_changed.emit()
+
+    def drop_widgets(self, items: list[WidgetItem]):
+        """Snap dragged widgets to the grid, or move them all back if any of them doesn't fit"""
+        moves = {
+            item: (*self.snap_cell(item.pos(), item.span_x, item.span_y), item.span_x, item.span_y) for item in items
+        }
+        fits = self.occupancy.can_move(moves)
+        for item in items:
+            if fits:
+                item.snap_to_grid()
+            else:
+                item.setPos(item.start_pos)
+            self.place_widget(item)
+
     def hide_highlight(self):
         self.highlight_rect.hide()
 
     def draw_grid(self):
-        for item in reversed(self.grid_lines):
-            self.scene().removeItem(item)
-            self.grid_lines.remove(item)
-
+        """Redraw the background grid after its size, dimensions or theme changed"""
+        self._grid_tile = None
+        self.scene().setSceneRect(0, 0, self.cols * self.grid_size, self.rows * self.grid_size)
+        self.resetCachedContent()
+        self.viewport().update()
+        self.viewport_changed.emit()
+
+    def visible_cells(self) -> QRect:
+        """Cells at least partly inside the viewport"""
+        area = self.mapToScene(self.viewport().rect()).boundingRect()
         grid_size = self.grid_size
-        rows, cols = self.rows, self.cols
-        pen = QPen(QColor(self.theme.value.border), 1, Qt.PenStyle.DashLine)
-        for i in range(cols + 1):
-            x = i * grid_size
-            self.grid_lines.append(self.scene().addLine(x, 0, x, rows * grid_size, pen))
-        for i in range(rows + 1):
-            y = i * grid_size
-            self.grid_lines.append(self.scene().addLine(0, y, cols * grid_size, y, pen))
-        self.scene().setSceneRect(0, 0, cols * grid_size, rows * grid_size)
+        left, top = math.floor(area.left() / grid_size), math.floor(area.top() / grid_size)
+        right, bottom = math.ceil(area.right() / grid_size), math.ceil(area.bottom() / grid_size)
+        return QRect(left, top, right - left, bottom - top)
+
+    def zoom(self) -> float:
+        return self.transform().m11()
+
+    def set_zoom(self, zoom: float):
+        zoom = max(self.min_zoom, min(zoom, self.max_zoom))
+        if zoom != self.zoom():
+            self.scale(zoom / self.zoom(), zoom / self.zoom())
+            self.viewport_changed.emit()
+
+    def zoom_by(self, factor: float):
+        self.set_zoom(self.zoom() * factor)
+
+    @override
+    def wheelEvent(self, event: QWheelEvent):
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            # One notch is 120, smooth-scrolling devices send fractions of it
+            self.zoom_by(1.25 ** (event.angleDelta().y() / 120))
+            event.accept()
+        else:
+            super().wheelEvent(event)
+
+    @override
+    def mousePressEvent(self, event: QMouseEvent):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self._pan_origin = event.position().toPoint()
+            self.viewport().setCursor(Qt.CursorShape.ClosedHandCursor)
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+
+    @override
+    def mouseMoveEvent(self, event: QMouseEvent):
+        if self._pan_origin is not None:
+            position = event.position().toPoint()
+            delta = position - self._pan_origin
+            self._pan_origin = position
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+            event.accept()
+        else:
+            super().mouseMoveEvent(event)
+
+    @override
+    def mouseReleaseEvent(self, event: QMouseEvent):
+        if event.button() == Qt.MouseButton.MiddleButton and self._pan_origin is not None:
+            self._pan_origin = None
+            self.viewport().unsetCursor()
+            event.accept()
+        else:
+            super().mouseReleaseEvent(event)
+
+    def update_culling(self):
+        """Hold back topic changes of bound widgets outside the viewport"""
+        area = self.mapToScene(self.viewport().rect()).boundingRect()
+        visible = set(self.scene().items(area))
+        self.bindings.set_culled({widget for widget in self.bindings.widgets() if widget not in visible})
+
+    @override
+    def scrollContentsBy(self, dx: int, dy: int):
+        super().scrollContentsBy(dx, dy)
+        self.viewport_changed.emit()
+
+    @override
+    def resizeEvent(self, event: QResizeEvent):
+        super().resizeEvent(event)
+        self.viewport_changed.emit()
 
     def set_grid_size(self, size: int):
         self.grid_size = size
         self.draw_grid()
-        self.highlight_rect = self.scene().addRect(
-            0, 0, self.grid_size, self.grid_size, QPen(Qt.PenStyle.NoPen), QBrush(QColor(0, 255, 0, 100))
-        )
-        self.highlight_rect.setZValue(3)
-        self.highlight_rect.hide()
         for item in self.scene().items():
             if isinstance(item, WidgetItem):
                 old_x = item.pos().x() // item.grid_size
@@ -295,15 +572,7 @@ class GridGraphicsView(QGraphicsView):
 
     def can_resize_to(self, new_rows, new_cols):
         """Check if all current widgets would fit in the new dimensions"""
-        for item in self.scene().items():
-            if not isinstance(item, WidgetItem):
-                continue
-            if (
-                item.pos().x() + item.span_x * self.grid_size > new_cols * self.grid_size
-                or item.pos().y() + item.span_y * self.grid_size > new_rows * self.grid_size
-            ):
-                return False
-        return True
+        return self.occupancy.fits(new_rows, new_cols)
 
     def resize_grid(self, rows, cols):
         """Attempt to resize the grid while preserving widget instances"""
@@ -311,40 +580,34 @@ class GridGraphicsView(QGraphicsView):
         if not self.can_resize_to(rows, cols):
             return False
 
-        widgets = [item for item in self.scene().items() if isinstance(item, WidgetItem)]
-
-        for widget in widgets:
-            self.scene().removeItem(widget)
-
-        self.scene().clear()
-        self.grid_lines.clear()
-
         self.rows = rows
         self.cols = cols
+        self.occupancy.resize(rows, cols)
 
         self.draw_grid()
+        return True
 
-        self.highlight_rect = self.scene().addRect(
-            0, 0, self.grid_size, self.grid_size, QPen(Qt.PenStyle.NoPen), QBrush(QColor(0, 255, 0, 100))
-        )
-        self.highlight_rect.setZValue(3)
-        self.highlight_rect.hide()
 
-        for widget in widgets:
-            self.scene().addItem(widget)
+class PendingWidget:
+    """Layout entry of a widget outside the viewport, it holds its cells until it is created"""
 
-        return True
+    __slots__ = ("item",)
+
+    def __init__(self, item: dict):
+        self.item = item
 
 
 class WidgetGridController(QObject):
     def __init__(self, view: GridGraphicsView) -> None:
         super().__init__()
         self.view: GridGraphicsView = view
+        self.item_loader: Callable[[dict], WidgetItem] | None = None
+        """Loader of the last layout, used to create its pending widgets"""
+        self.pending = 0
+        """Widgets of the last layout not created yet"""
+        self._watching = False
 
     def add(self, item: WidgetItem):
-        grid_size = self.view.grid_size
-        rows, cols = self.view.rows, self.view.cols
-
         # Calculate final spans before position checking
         final_span_x = max(item.span_x, ((item.min_width + self.view.grid_size - 1) // self.view.grid_size))
         final_span_y = max(item.span_y, ((item.min_height + self.view.grid_size - 1) // self.view.grid_size))
@@ -352,100 +615,335 @@ class WidgetGridController(QObject):
         # Pre-apply the spans to ensure correct collision detection
         item.set_span(final_span_x, final_span_y)
 
-        # Iterate through possible positions with corrected spans
-        for row in range(rows - final_span_y + 1):
-            for col in range(cols - final_span_x + 1):
-                test_pos = QPointF(col * grid_size, row * grid_size)
-
-                # Create a rect that covers the entire final span area
-                span_rect = QRectF(
-                    test_pos,
-                    QPointF(test_pos.x() + (final_span_x * grid_size), test_pos.y() + (final_span_y * grid_size)),
-                )
-
-                # Temporarily position the item for accurate collision testing
-                original_pos = item.pos()
-                item.setPos(test_pos)
-
-                # Get all items at the test position
-                colliding_items = [
-                    i for i in self.view.scene().items(span_rect) if isinstance(i, WidgetItem) and i != item
-                ]
-
-                # Reset position
-                item.setPos(original_pos)
-
-                if not colliding_items:
-                    # Position is valid, place the widget
-                    item.setPos(test_pos)
-                    self.view.scene().addItem(item)
-                    item.item_deleted.connect(functools.partial(self.remove_widget))
-                    return
-
-        # If we get here, no valid position was found
+        cell = self.view.occupancy.find_free(final_span_x, final_span_y)
+        if cell is not None:
+            self.add_to_pos(item, *cell)
 
     def add_to_pos(self, item: WidgetItem, x, y):
+        self._insert(item, int(x), int(y))
+        self.view.layout_changed.emit()
+
+    def _insert(self, item: WidgetItem, x: int, y: int):
         grid_size = self.view.grid_size
         item.setPos(x * grid_size, y * grid_size)
         self.view.scene().addItem(item)
+        self.view.occupancy.place(item, x, y, item.span_x, item.span_y)
+        self.view.bindings.bind(item)
         item.item_deleted.connect(functools.partial(self.remove_widget))
 
     def remove_widget(self, widget):
+        self.view.occupancy.remove(widget)
+        self.view.bindings.unbind(widget)
         self.view.scene().removeItem(widget)
+        self.view.layout_changed.emit()
+
+    def clear(self):
+        """Remove every widget, including pending ones"""
+        occupancy = self.view.occupancy
+        with self._batch():
+            for entry in list(occupancy):
+                if isinstance(entry, PendingWidget):
+                    occupancy.remove(entry)
+                else:
+                    self.remove_widget(entry)
+        self.pending = 0
 
     def get_widgets(self) -> list:
         widgets = []
-        for item in self.view.scene().items():
-            if isinstance(item, WidgetItem):
-                widget_info = {
-                    "pos": (item.pos().x() // item.grid_size, item.pos().y() // item.grid_size),
-                    "span_x": item.span_x,
-                    "span_y": item.span_y,
-                    "info": item.info,
-                    "kind": item.kind,
-                    "title": item.title,
-                }
-                widgets.append(widget_info)
+        occupancy = self.view.occupancy
+        for item in occupancy:
+            x, y, span_x, span_y = occupancy.rect(item)  # type: ignore
+            if isinstance(item, PendingWidget):
+                widgets.append({**item.item, "pos": (x, y), "info": dict(item.item["info"])})
+                continue
+            widget_info = {
+                "pos": (x, y),
+                "span_x": span_x,
+                "span_y": span_y,
+                # Copied since the list is serialized in the layout saver's thread
+                "info": dict(item.info),  # type: ignore
+                "kind": item.kind,  # type: ignore
+                "title": item.title,  # type: ignore
+            }
+            widgets.append(widget_info)
         return widgets
 
+    @contextmanager
+    def _batch(self) -> Iterator[None]:
+        """Suspend scene indexing and view updates while many items are inserted or removed"""
+        scene = self.view.scene()
+        index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        self.view.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            # Rebuilds the index once for every inserted item
+            scene.setItemIndexMethod(index_method)
+            self.view.setUpdatesEnabled(True)
+
     def load(self, item_loader: Callable[[dict], WidgetItem], items: list[dict]):
+        """
+        Add the widgets of a layout in one batch.
+        Widgets outside the viewport only reserve their cells, they are created once they scroll into view.
+        """
+        self.item_loader = item_loader
+        visible = self.view.visible_cells()
+        occupancy = self.view.occupancy
+        widgets = []
         for item in items:
-            widget_item = item_loader(item)
-            self.add_to_pos(widget_item, item["pos"][0], item["pos"][1])
+            x, y = int(item["pos"][0]), int(item["pos"][1])
+            if visible.intersects(QRect(x, y, item["span_x"], item["span_y"])):
+                widgets.append((item_loader(item), x, y))
+            else:
+                occupancy.place(PendingWidget(item), x, y, item["span_x"], item["span_y"])
+                self.pending += 1
+
+        with self._batch():
+            for widget, x, y in widgets:
+                self._insert(widget, x, y)
+
+        if self.pending and not self._watching:
+            self.view.viewport_changed.connect(self.materialize_visible)
+            self._watching = True
+
+    @traced("layout.materialize")
+    def materialize_visible(self):
+        """Create the pending widgets that are at least partly inside the viewport"""
+        if not self.pending or self.item_loader is None:
+            return
+        occupancy = self.view.occupancy
+        visible = occupancy.items_in(*self.view.visible_cells().getRect())
+        entries = [entry for entry in visible if isinstance(entry, PendingWidget)]
+        if not entries:
+            return
+
+        with self._batch():
+            for entry in entries:
+                x, y, _span_x, _span_y = occupancy.rect(entry)  # type: ignore
+                occupancy.remove(entry)
+                self._insert(self.item_loader(entry.item), x, y)
+        self.pending -= len(entries)
 
 
 class WidgetPalette(QWidget):
-    def __init__(self, graphics_view, client: CommunicationClient, parent=None):
+    def __init__(self, graphics_view, client: CommunicationClient, history: TopicHistory, ages: TopicAges, parent=None):
         super().__init__(parent)
         
         self.client = client
+        self.history = history
+        self.ages = ages
 
         self.graphics_view = graphics_view
         self.controller = WidgetGridController(self.graphics_view)
+        self.widget_context = WidgetContext(graphics_view, client, history, ages)
 
         layout = QVBoxLayout(self)
         layout.setSpacing(10)
         layout.setContentsMargins(0, 0, 0, 0)
 
+        add_layout = QHBoxLayout()
+        layout.addLayout(add_layout)
+
+        # Listing the kinds doesn't import them, a plugin is only loaded once one of its widgets is added
+        self.kinds = QComboBox()
+        self.kinds.addItems(kinds())
+        add_layout.addWidget(self.kinds, 1)
+
+        self.add_button = QPushButton("Add")
+        self.add_button.clicked.connect(self.add_selected_kind)
+        add_layout.addWidget(self.add_button)
+
+        self.search = QLineEdit(placeholderText="Search topics", clearButtonEnabled=True)  # type: ignore
+        self.search.textChanged.connect(self.update_search)
+        layout.addWidget(self.search)
+
+        self.views = QStackedWidget()
+        layout.addWidget(self.views)
+
         self.tree = QTreeView()
         self.tree.setHeaderHidden(True)
-        layout.addWidget(self.tree)
+        self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self._tree_menu)
+        self.views.addWidget(self.tree)
+
+        self.topic_index = TopicIndex()
+        self.results_model = QStringListModel()
+        self.results = QListView()
+        self.results.setModel(self.results_model)
+        self.results.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.results.clicked.connect(self._result_activated)
+        self.results.activated.connect(self._result_activated)
+        self.views.addWidget(self.results)
 
         self.model = DictTreeModel({})
+
+        # Expansion and selection are tracked by path, so they come back when a topic disappears and reappears
+        self.expanded_paths: set[str] = set()
+        self.selected_path: str | None = None
+        self._restore_pending = False
+        self._restoring = False
+        self._removing = False
+
+        # Connected before the view so the flag is set by the time the view moves its selection off removed rows
+        self.model.rowsAboutToBeRemoved.connect(self._rows_about_to_be_removed)
+        self.model.rowsRemoved.connect(self._rows_removed)
+        self.model.rowsInserted.connect(self._schedule_restore)
+
         self.tree.setModel(self.model)
-        self.tree.selectionChanged = self._tree_select
+        self.tree.expanded.connect(self._tree_expanded)
+        self.tree.collapsed.connect(self._tree_collapsed)
+        self.tree.selectionModel().selectionChanged.connect(self._tree_select)
 
-        self.panel = TopicStatusPanel(self.client)
+        self.panel = TopicStatusPanel(self.client, self.history, self.ages)
         layout.addWidget(self.panel)
 
-    def _tree_select(self, selected: QItemSelection, _: QItemSelection):
-        self.panel.set_data(selected.indexes()[0].data(Qt.ItemDataRole.UserRole))
+    def apply_diff(self, diff: TopicDiff):
+        if diff.tree is not None:
+            # The model diffs the full hierarchy against the live tree so expansion, selection and scroll position
+            # are kept
+            self.model.update_data(diff.tree)
+        else:
+            self.model.apply_diff(diff.updated, diff.removed)
+
+        count = len(self.topic_index)
+        for key in diff.removed:
+            self.topic_index.discard(key)
+        for key in diff.updated:
+            self.topic_index.add(key)
+        if diff.removed or len(self.topic_index) != count:
+            self.update_search()
+
+        self.panel.topics_changed(diff.updated.keys() | set(diff.removed))
+
+    def update_search(self):
+        query = self.search.text()
+        if not query.strip():
+            self.views.setCurrentWidget(self.tree)
+            return
+        self.results_model.setStringList(self.topic_index.search(query))
+        self.views.setCurrentWidget(self.results)
+
+    def _result_activated(self, index: QModelIndex):
+        self.reveal(index.data())
+
+    def reveal(self, key: str):
+        """Expand the tree down to a topic and select it"""
+        index = self.model.fetch_path(key)
+        if not index.isValid():
+            return
+
+        parent = index.parent()
+        while parent.isValid():
+            self.tree.setExpanded(parent, True)
+            parent = parent.parent()
+
+        self.tree.selectionModel().setCurrentIndex(
+            index, QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows
+        )
+        self.tree.scrollTo(index)
+
+    def _rows_about_to_be_removed(self):
+        self._removing = True
+
+    def _rows_removed(self):
+        self._removing = False
+
+    def _tree_expanded(self, index: QModelIndex):
+        self.expanded_paths.add(self.model.key_for_index(index))
+
+    def _tree_collapsed(self, index: QModelIndex):
+        self.expanded_paths.discard(self.model.key_for_index(index))
+
+    def _tree_select(self, selected: QItemSelection, deselected: QItemSelection):
+        if self._restoring or (selected.isEmpty() and deselected.isEmpty()):
+            return
+
+        if self._removing:
+            # The view moved the selection because the selected topic was removed, keep tracking the removed one
+            self._schedule_restore()
+            return
+
+        indexes = selected.indexes()
+        self.selected_path = self.model.key_for_index(indexes[0]) if indexes else None
+        self.panel.set_data(indexes[0].data(Qt.ItemDataRole.UserRole) if indexes else None)
+
+    def _schedule_restore(self):
+        if not self._restore_pending:
+            self._restore_pending = True
+            QTimer.singleShot(0, self.restore_state)
+
+    @traced("palette.restore_state")
+    def restore_state(self):
+        """Re-apply the tracked expansion and selection to the current tree"""
+        self._restore_pending = False
+
+        # Parents first, children of a folder only exist once it has been expanded and fetched
+        for path in sorted(self.expanded_paths, key=len):
+            index = self.model.index_for_key(path)
+            if index.isValid() and not self.tree.isExpanded(index):
+                self.tree.setExpanded(index, True)
+
+        selection_model = self.tree.selectionModel()
+        index = self.model.index_for_key(self.selected_path) if self.selected_path is not None else QModelIndex()
+        selected = selection_model.selectedIndexes()
+        if index != (selected[0] if selected else QModelIndex()):
+            self._restoring = True
+            if index.isValid():
+                selection_model.setCurrentIndex(
+                    index,
+                    QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows,
+                )
+            else:
+                selection_model.clear()
+            self._restoring = False
+
+    def _tree_menu(self, pos):
+        index = self.tree.indexAt(pos)
+        key = index.data(Qt.ItemDataRole.UserRole) if index.isValid() else None
+        raw = self.client.get_raw(key) if key else None
+        if not raw:
+            return
 
-    def add_widget(self, widget_name):
-        self.controller.add(WidgetItem(widget_name, self.graphics_view))
+        menu = QMenu(self.tree)
+        for viewable in raw.get("struct", {}).get("dashboard", []):
+            element = viewable.get("element")
+            if isinstance(raw.get(element), int | float):
+                menu.addAction(f"Plot {element}", functools.partial(self.add_plot, key, element))
+        if not menu.isEmpty():
+            menu.exec(self.tree.viewport().mapToGlobal(pos))
+
+    def add_widget(self, kind: str, title: str, data: dict | None = None):
+        widget_class = load_kind(kind)
+        if widget_class is None:
+            return
+        span_x, span_y = widget_class.default_span
+        widget = widget_class.create(self.widget_context, title, span_x, span_y, data or {})
+        widget.kind = kind
+        self.controller.add(widget)
+
+    def add_selected_kind(self):
+        """Add a widget of the chosen kind, bound to the selected topic if there is one"""
+        kind = self.kinds.currentText()
+        key = self.tree.currentIndex().data(Qt.ItemDataRole.UserRole)
+        if not key:
+            self.add_widget(kind, kind)
+            return
+
+        widget_class = load_kind(kind)
+        if widget_class is None:
+            return
+        info = widget_class.topic_info(key, self.client.get_raw(key) or {})
+        if info is None:
+            Logger().warning(f"A {kind} widget can't show {key}")
+            return
+        self.add_widget(kind, key, info)
+
+    def add_plot(self, key: str, element: str):
+        self.add_widget("plot", key, {"topic": key, "element": element})
 
     def remove_widget(self, widget):
-        self.graphics_view.scene().removeItem(widget)
+        self.controller.remove_widget(widget)
 
 
 class SettingsWindow(QDialog):
@@ -490,6 +988,25 @@ class SettingsWindow(QDialog):
         self.net_port = QSpinBox(minimum=1024, maximum=65535, value=self.settings.value("port", 8765, int))  # type: ignore
         self.form.addRow("Port", self.net_port)
 
+        self.form.addRow(Divider("Data"))
+
+        self.history_size = QSpinBox(
+            minimum=1,
+            maximum=4096,
+            suffix=" MB",
+            value=self.settings.value("history", 32, int),  # type: ignore
+        )
+        self.form.addRow("History Memory", self.history_size)
+
+        self.stale_after = QDoubleSpinBox(
+            minimum=0.1,
+            maximum=3600,
+            singleStep=0.5,
+            suffix=" s",
+            value=self.settings.value("stale", 2.0, float),  # type: ignore
+        )
+        self.form.addRow("Stale After", self.stale_after)
+
         self.button_layout = QHBoxLayout()
         self.button_layout.addStretch()
         self.root_layout.addLayout(self.button_layout)
@@ -546,11 +1063,17 @@ class UiColorSettingsSwitcher(QFrame):
         self.main_window.apply_theme()
 
 class TopicStatusPanel(QStackedWidget):
-    def __init__(self, client: CommunicationClient):
+    history_window = 10
+    """Seconds of history summarized in the panel"""
+
+    def __init__(self, client: CommunicationClient, history: TopicHistory, ages: TopicAges):
         super().__init__()
         self.setFrameShape(QFrame.Shape.Panel)
 
         self.client = client
+        self.history = history
+        self.ages = ages
+        self.topic: str | None = None
 
         no_data_label = QLabel("Select a topic for more info", alignment=Qt.AlignmentFlag.AlignCenter)
         no_data_label.setContentsMargins(16, 16, 16, 16)
@@ -571,24 +1094,48 @@ class TopicStatusPanel(QStackedWidget):
         self.data_type = QLabel("Data Type: Unknown")
         data_layout.addWidget(self.data_type)
 
+        self.data_age = QLabel()
+        data_layout.addWidget(self.data_age)
+
+        self.data_history = QLabel()
+        data_layout.addWidget(self.data_history)
+
         data_layout.addStretch()
 
         self.set_data(None)
 
     def set_data(self, data: str | None):
+        self.topic = data
         if not data:
             self.setCurrentIndex(0)
             return
-        
+
         self.setCurrentIndex(1)
 
         self.data_topic.setText(data)
         raw = self.client.get_raw(data)
         self.data_type.setText(f"Data Type: {raw['did'] if raw else 'Unknown'}")
+        self.update_age()
+
+        lines = []
+        for element, (_times, values) in self.history.windows(data, self.history_window).items():
+            if len(values):
+                lines.append(f"{element}: {values.min():.4g} / {values.mean():.4g} / {values.max():.4g}")
+        if lines:
+            lines.insert(0, f"Last {self.history_window}s (min / avg / max)")
+        self.data_history.setText("\n".join(lines))
+
+    def topics_changed(self, keys: Iterable[str]):
+        if self.topic in keys:
+            self.set_data(self.topic)
+
+    def update_age(self):
+        age = self.ages.age(self.topic) if self.topic else None
+        self.data_age.setText(f"Last Update: {age:.1f}s ago" if age is not None else "Last Update: Unknown")
 
 
 class Application(QMainWindow):
-    def __init__(self, app: QApplication):
+    def __init__(self, app: QApplication, replay: str | None = None):
         super().__init__()
         self.setWindowTitle("KevinbotLib Dashboard")
 
@@ -596,13 +1143,48 @@ class Application(QMainWindow):
 
         self.logger = Logger()
 
-        self.client = CommunicationClient(
-            host=self.settings.value("ip", "10.0.0.2", str),  # type: ignore
-            port=self.settings.value("port", 8765, int),  # type: ignore
-            on_disconnect=self.on_disconnect,
-            on_connect=self.on_connect,
-        )
-        self.client.connect()
+        self.history = TopicHistory(self.settings.value("history", 32, int) * 1024 * 1024)  # type: ignore
+        self.ages = TopicAges()
+        self.latency = LatencyMonitor()
+
+        self.pipeline = TopicPipeline(self)
+        self.pipeline.diff_ready.connect(self.apply_diff)
+        # The worker thread has to be stopped even if the event loop is left without closing the window
+        app.aboutToQuit.connect(self.pipeline.stop)
+
+        # Incoming messages mark keys dirty from the client thread, the GUI thread only processes those keys
+        # and at most once per frame
+        self.updates = TopicUpdateQueue(self)
+        self.tree_pacer = FramePacer(self.update_tree, parent=self)
+        self.updates.updated.connect(self.tree_pacer.schedule, Qt.ConnectionType.QueuedConnection)
+
+        self.recorder: TelemetryRecorder | None = None
+
+        self.replay: ReplaySource | None = None
+        if replay is not None:
+            try:
+                self.replay = ReplaySource(replay, self.on_replay_update, self.on_topic_delete, self)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Could not open {replay} for replay: {e!r}")
+
+        self.client: CommunicationClient | ReplaySource
+        if self.replay is not None:
+            self.replay.reset.connect(self.replay_reset)
+            self.history.clock = self.replay.time
+            self.ages.clock = self.replay.time
+            self.client = self.replay
+            self.synced_store = self.client.data_store
+        else:
+            self.client = CommunicationClient(
+                host=self.settings.value("ip", "10.0.0.2", str),  # type: ignore
+                port=self.settings.value("port", 8765, int),  # type: ignore
+                on_update=self.on_topic_update,
+                on_delete=self.on_topic_delete,
+                on_disconnect=self.on_disconnect,
+                on_connect=self.on_connect,
+            )
+            self.synced_store = self.client.data_store
+            self.client.connect()
 
         self.notifier = Notifier(self)
 
@@ -614,22 +1196,50 @@ class Application(QMainWindow):
         self.save_action = self.file_menu.addAction("Save Layout", self.save_slot)
         self.save_action.setShortcut("Ctrl+S")
 
+        self.record_action = self.file_menu.addAction("Record Telemetry")
+        self.record_action.setCheckable(True)
+        self.record_action.setEnabled(self.replay is None)
+        self.record_action.toggled.connect(self.toggle_recording)
+
         self.edit_menu = self.menu.addMenu("&Edit")
 
         self.settings_action = self.edit_menu.addAction("Settings", self.open_settings)
         self.settings_action.setShortcut("Ctrl+,")
 
+        self.view_menu = self.menu.addMenu("&View")
+
+        self.perf_action = self.view_menu.addAction("Performance HUD")
+        self.perf_action.setCheckable(True)
+
+        self.perf_dump_action = self.view_menu.addAction("Save Performance Samples", self.save_perf_samples)
+
         self.status = self.statusBar()
 
-        self.connection_status = QLabel("Robot Disconnected")
+        self.connection_status = QLabel("Robot Disconnected" if self.replay is None else "Replay")
         self.status.addWidget(self.connection_status)
 
-        self.ip_status = QLabel(str(self.settings.value("ip", "10.0.0.2", str)), alignment=Qt.AlignmentFlag.AlignCenter)
+        self.ip_status = QLabel(
+            str(self.settings.value("ip", "10.0.0.2", str)) if self.replay is None else self.replay.log.path,
+            alignment=Qt.AlignmentFlag.AlignCenter,
+        )
         self.status.addWidget(self.ip_status, 1)
 
+        self.recording_status = QLabel("Recording")
+        self.recording_status.hide()
+        self.status.addPermanentWidget(self.recording_status)
+
+        self.perf_hud = perf.PerfHud(perf.stats)
+        self.perf_hud.setVisible(False)
+        self.status.addPermanentWidget(self.perf_hud)
+        self.perf_action.toggled.connect(self.set_perf_hud_visible)
+        self.perf_action.setChecked(self.settings.value("perf_hud", False, bool))  # type: ignore
+
         self.latency_status = QLabel("Latency: 0.00")
         self.status.addPermanentWidget(self.latency_status)
 
+        self.latency_sparkline = Sparkline()
+        self.status.addPermanentWidget(self.latency_sparkline)
+
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
 
@@ -641,29 +1251,59 @@ class Application(QMainWindow):
             cols=self.settings.value("cols", 10, int),  # type: ignore
             theme=GridThemes.Dark,
         )
-        palette = WidgetPalette(self.graphics_view, self.client)
-        self.model = palette.model
-        self.tree = palette.tree
+        self.widget_palette = WidgetPalette(self.graphics_view, self.client, self.history, self.ages)
+        self.model = self.widget_palette.model
+        self.tree = self.widget_palette.tree
 
         layout.addWidget(self.graphics_view)
-        layout.addWidget(palette)
+        layout.addWidget(self.widget_palette)
+
+        self.view_menu.addSeparator()
+        self.zoom_in_action = self.view_menu.addAction("Zoom In", lambda: self.graphics_view.zoom_by(1.25))
+        self.zoom_in_action.setShortcut(QKeySequence.StandardKey.ZoomIn)
+        self.zoom_out_action = self.view_menu.addAction("Zoom Out", lambda: self.graphics_view.zoom_by(1 / 1.25))
+        self.zoom_out_action.setShortcut(QKeySequence.StandardKey.ZoomOut)
+        self.zoom_reset_action = self.view_menu.addAction("Reset Zoom", lambda: self.graphics_view.set_zoom(1))
+        self.zoom_reset_action.setShortcut("Ctrl+0")
 
         self.latency_timer = QTimer()
         self.latency_timer.setInterval(1000)
         self.latency_timer.timeout.connect(self.update_latency)
         self.latency_timer.start()
 
-        self.update_timer = QTimer()
-        self.update_timer.setInterval(100)
-        self.update_timer.timeout.connect(self.update_tree)
-        self.update_timer.start()
+        # One timer ages every topic, rather than one per topic
+        self.age_timer = QTimer()
+        self.age_timer.setInterval(500)
+        self.age_timer.timeout.connect(self.update_ages)
+        self.age_timer.start()
+
+        # The client replaces its whole data store on sync and disconnect without a callback
+        self.resync_timer = QTimer()
+        self.resync_timer.setInterval(1000)
+        self.resync_timer.timeout.connect(self.check_resync)
+        self.resync_timer.start()
 
         self.controller = WidgetGridController(self.graphics_view)
-        self.controller.load(self.item_loader, self.settings.value("layout", [], type=list))  # type: ignore
+        self.layout_store = LayoutStore(default_layout_path(), self.controller.get_widgets, parent=self)
+        self.layout_store.saved.connect(self.layout_saved)
+        self.layout_store.failed.connect(self.layout_failed)
+        self.save_requested = False
+        """A manual save is waiting for the writer, autosaves don't show a toast"""
+        app.aboutToQuit.connect(self.layout_store.stop)
+        with tracer.span("layout.load"):
+            self.controller.load(self.item_loader, self.load_layout())
+        self.graphics_view.layout_changed.connect(self.layout_store.schedule)
 
         self.settings_window = SettingsWindow(self, self.settings)
         self.settings_window.on_applied.connect(self.refresh_settings)
 
+        if self.replay is not None:
+            self.replay_toolbar = QToolBar("Replay")
+            self.replay_toolbar.setMovable(False)
+            self.replay_toolbar.addWidget(ReplayControls(self.replay))
+            self.addToolBar(Qt.ToolBarArea.BottomToolBarArea, self.replay_toolbar)
+            self.replay.seek(self.replay.start)
+
         self.theme = Theme(ThemeStyle.System)
         self.apply_theme()
 
@@ -684,121 +1324,154 @@ class Application(QMainWindow):
         self.theme.apply(self)
 
 
+    @traced("update_latency")
     def update_latency(self):
-        if self.client.websocket:
-            self.latency_status.setText(f"Latency: {self.client.websocket.latency*1000:.2f}ms")
-
-    @Slot()
-    def update_tree(self):
-        # Get the latest data
-        data_store = self.client.get_keys()
-        data = {}
-
-        # here we process what data can be displayed
-        for key, value in [(key, self.client.get_raw(key)) for key in data_store]:
-            if not value:
-                continue
-
-            if "struct" in value and "dashboard" in value["struct"]:
-                structured = {}
-                for viewable in value["struct"]["dashboard"]:
-                    display = ""
-                    if "element" in viewable:
-                        raw = value[viewable["element"]]
-                        if "format" in viewable:
-                            fmt = viewable["format"]
-                            if fmt == "percent":
-                                display = f"{raw * 100:.2f}%"
-                            elif fmt == "degrees":
-                                display = f"{raw}°"
-                            elif fmt == "radians":
-                                display = f"{raw} rad"
-                            elif fmt.startswith("limit:"):
-                                limit = int(fmt.split(":")[1])
-                                display = raw[:limit]
-                            else:
-                                display = raw
-
-                    structured[viewable["element"]] = display
-                data[key] = structured
-            else:
-                self.logger.trace(f"Could not display {key}, it dosen't contain a structure")
-
-        def to_hierarchical_dict(flat_dict: dict):
-            """Convert a flat dictionary into a hierarchical one based on '/'."""
-            hierarchical_dict = {}
-            for key, value in flat_dict.items():
-                parts = key.split("/")
-                d = hierarchical_dict
-                for part in parts[:-1]:
-                    d = d.setdefault(part, {})
-                d[parts[-1]] = {"items": value, "key": key}
-            return hierarchical_dict
-
-        # Convert flat dictionary to hierarchical
-
-        expanded_indexes = []
-
-        def store_expansion(parent):
-            for row in range(self.model.rowCount(parent)):
-                index = self.model.index(row, 0, parent)
-                if self.tree.isExpanded(index):
-                    expanded_indexes.append((self.get_index_path(index), True))
-                store_expansion(index)
-
-        store_expansion(QModelIndex())
-
-        # Store selection
-        selected_paths = self.get_selection_paths()
-
-        # Update data...
-        h = to_hierarchical_dict(data)
-        self.model.update_data(h)
-
-        # Restore states
-        def restore_expansion():
-            for path, was_expanded in expanded_indexes:
-                index = self.get_index_from_path(path)
-                if index.isValid() and was_expanded:
-                    self.tree.setExpanded(index, True)
-
-        restore_expansion()
-
-        # Restore selection
-        self.restore_selection(selected_paths)
+        if not self.client.websocket:
+            return
 
-    def get_selection_paths(self):
-        return [
-            self.get_index_path(index) for index in self.tree.selectionModel().selectedIndexes() if index.column() == 0
-        ]
+        self.latency.add(self.client.websocket.latency * 1000)
+        stats = self.latency.stats()
+        self.latency_status.setText(f"Latency: {stats.last:.2f}ms (p95 {stats.p95:.2f}, jitter {stats.jitter:.2f})")  # type: ignore
+        self.latency_status.setToolTip(
+            f"Last {len(self.latency.values())} samples\n"
+            f"Min: {stats.min:.2f}ms\nAvg: {stats.avg:.2f}ms\nP95: {stats.p95:.2f}ms\nMax: {stats.max:.2f}ms\n"  # type: ignore
+            f"Jitter: {stats.jitter:.2f}ms"  # type: ignore
+        )
+        self.latency_sparkline.set_values(self.latency.values())
+
+    @traced("update_ages")
+    def update_ages(self):
+        stale = self.ages.stale(self.settings.value("stale", 2.0, float))  # type: ignore
+        self.model.set_stale(stale)
+        bindings = self.graphics_view.bindings
+        for item in bindings.widgets():
+            item.set_stale(not stale.isdisjoint(bindings.keys(item)))  # type: ignore
+        self.widget_palette.panel.update_age()
+
+    @traced("check_resync")
+    def check_resync(self):
+        if self.client.data_store is not self.synced_store:
+            self.updates.mark_all()
+
+    def on_topic_update(self, key: str, value: dict, timestamp: float | None = None):
+        # Recorded here rather than in update_tree so samples between GUI updates aren't lost
+        self.history.record(key, value["data"], timestamp)
+        self.ages.touch(key, timestamp)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_update(key, value["data"])
+        self.updates.mark_dirty(key)
+        self.graphics_view.bindings.mark_sampled(key)
+
+    def on_replay_update(self, key: str, value: dict):
+        # The replay clock only advances once per step, every record keeps its own time from the log
+        self.on_topic_update(key, value, value["tsu"])
+
+    def on_topic_delete(self, key: str):
+        self.history.discard(key)
+        self.ages.discard(key)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_delete(key)
+        self.updates.mark_dirty(key)
+
+    def replay_reset(self):
+        # History from before a seek would show up in the future of the new position
+        self.history.clear()
+        self.ages.clear()
+        for key, entry in self.replay.data_store.items():  # type: ignore
+            self.ages.touch(key, entry["tsu"])
+        self.updates.mark_all()
+
+    def toggle_recording(self, checked: bool):
+        if not checked:
+            self.stop_recording()
+            return
 
-    def restore_selection(self, paths):
-        selection_model = self.tree.selectionModel()
-        selection_model.clear()
-        for path in paths:
-            index = self.get_index_from_path(path)
-            if index.isValid():
-                selection_model.select(index, selection_model.SelectionFlag.Select | selection_model.SelectionFlag.Rows)
+        path, _ = QFileDialog.getSaveFileName(self, "Record Telemetry", "", "Telemetry Log (*.kblog)")
+        if not path:
+            self.record_action.setChecked(False)
+            return
+        try:
+            self.start_recording(path)
+        except OSError as e:
+            self.notifier.toast("Recording Failed", str(e), severity=Severity.Error)
+            self.record_action.setChecked(False)
+
+    def start_recording(self, path: str):
+        self.recorder = TelemetryRecorder(path)
+        # Begin with the current value of every topic so the log is complete from its first second
+        for key, entry in list(self.client.data_store.items()):
+            self.recorder.record_update(key, entry["data"])
+        self.recording_status.show()
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        recorder.stop()
+        self.recording_status.hide()
+        self.notifier.toast("Recording Saved", f"Telemetry saved to {recorder.path}", severity=Severity.Success)
 
-    def get_index_path(self, index):
-        path = []
-        while index.isValid():
-            path.append(index.row())
-            index = self.model.parent(index)
-        return tuple(reversed(path))
+    @Slot()
+    def update_tree(self):
+        with perf.stats.measure("ingest"):
+            dirty, resync = self.updates.take()
+            if resync:
+                # Changed values are marked from the processed diff, only the sample history may have been reset
+                self.graphics_view.bindings.mark_all_sampled()
+                self.synced_store = self.client.data_store
+                keys = self.client.get_keys()
+                dirty.update(keys)
+                if self.replay is None:
+                    # A sync doesn't go through on_topic_update, count the synced values as fresh
+                    for key in keys:
+                        self.ages.touch(key)
+            elif not dirty:
+                return
+
+            # Only snapshot the raw payloads here, formatting happens in the pipeline's worker thread
+            snapshot = TopicSnapshot({key: self.client.get_raw(key) for key in dirty}, full=resync)
+        perf.stats.record("dirty", len(dirty))
+        tracer.counter("dirty", {"topics": len(dirty)})
+        self.pipeline.submit(snapshot)
+
+    @Slot(object)
+    def apply_diff(self, diff: TopicDiff):
+        if not diff:
+            return
 
-    def get_index_from_path(self, path):
-        index = QModelIndex()
-        for row in path:
-            index = self.model.index(row, 0, index)
-        return index
+        with perf.stats.measure("model"):
+            self.widget_palette.apply_diff(diff)
+        for key in diff.removed:
+            self.ages.discard(key)
+        # Only keys whose payload actually changed reach the widgets, repeated identical samples are skipped
+        bindings = self.graphics_view.bindings
+        for key in (*diff.updated, *diff.removed):
+            bindings.mark_changed(key)
+
+    def set_perf_hud_visible(self, visible: bool):
+        self.settings.setValue("perf_hud", visible)
+        if not visible:
+            perf.stats.clear()
+        self.perf_hud.setVisible(visible)
+
+    def save_perf_samples(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Performance Samples", "", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            perf.stats.dump(path)
+        except OSError as e:
+            self.notifier.toast("Save Failed", str(e), severity=Severity.Error)
 
     def on_connect(self):
         self.connection_status.setText("Robot Connected")
-        self.update_tree()
+        self.updates.mark_all()
 
     def on_disconnect(self):
         self.connection_status.setText("Robot Disconnected")
+        self.updates.mark_all()
 
     def refresh_settings(self):
         self.settings.setValue("ip", self.settings_window.net_ip.text())
@@ -808,6 +1481,10 @@ class Application(QMainWindow):
 
         self.ip_status.setText(str(self.settings.value("ip", "10.0.0.2", str)))
 
+        self.settings.setValue("history", self.settings_window.history_size.value())
+        self.settings.setValue("stale", self.settings_window.stale_after.value())
+        self.history.set_budget(self.settings.value("history", 32, int) * 1024 * 1024)  # type: ignore
+
         self.settings.setValue("grid", self.settings_window.grid_size.value())
         self.settings.setValue("rows", self.settings_window.grid_rows.value())
         self.settings.setValue("cols", self.settings_window.grid_cols.value())
@@ -820,6 +1497,24 @@ class Application(QMainWindow):
             self.settings.setValue("rows", self.graphics_view.rows)
             self.settings.setValue("cols", self.graphics_view.cols)
 
+    def load_layout(self) -> list[dict]:
+        widgets = self.layout_store.load()
+        if widgets is not None:
+            return widgets
+
+        # Layouts used to be kept in QSettings, move them to the layout file once
+        legacy = self.settings.value("layout", [], type=list)
+        if not legacy:
+            return []
+        widgets = migrate_layout(legacy)  # type: ignore
+        try:
+            write_layout(self.layout_store.path, widgets)
+        except OSError as e:
+            self.logger.error(f"Could not save layout to {self.layout_store.path}: {e!r}")
+        else:
+            self.settings.remove("layout")
+        return widgets
+
     def item_loader(self, item: dict) -> WidgetItem:
         kind = item["kind"]
         title = item["title"]
@@ -827,32 +1522,35 @@ class Application(QMainWindow):
         span_y = item["span_y"]
         data = item["info"]
 
-        match kind:
-            case "base":
-                return WidgetItem(title, self.graphics_view, span_x, span_y, data)
-
-        return WidgetItem(title, self.graphics_view, span_x, span_y)
+        widget_class = load_kind(kind)
+        if widget_class is None:
+            return PlaceholderWidgetItem(kind, title, self.graphics_view, span_x, span_y, data)
+        widget = widget_class.create(self.widget_palette.widget_context, title, span_x, span_y, data)
+        widget.kind = kind
+        return widget
 
     @override
     def closeEvent(self, event: QCloseEvent):
-        reply = QMessageBox.question(
-            self,
-            "Save Layout",
-            "Do you want to save the current layout before exiting?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
-        )
-
-        if reply == QMessageBox.StandardButton.Yes:
-            self.save_slot()
-            event.accept()
-        elif reply == QMessageBox.StandardButton.No:
-            event.accept()
-        else:
-            event.ignore()
+        # The layout is autosaved, only a pending save has to be finished
+        self.layout_store.stop()
+        self.stop_recording()
+        if self.replay is not None:
+            self.replay.close()
+        self.pipeline.stop()
+        event.accept()
 
     def save_slot(self):
-        self.settings.setValue("layout", self.controller.get_widgets())
-        self.notifier.toast("Layout Saved", "Layout saved successfully", severity=Severity.Success)
+        self.save_requested = True
+        self.layout_store.save()
+
+    def layout_saved(self):
+        if self.save_requested:
+            self.save_requested = False
+            self.notifier.toast("Layout Saved", "Layout saved successfully", severity=Severity.Success)
+
+    def layout_failed(self, message: str):
+        self.save_requested = False
+        self.notifier.toast("Layout Error", message, severity=Severity.Error)
 
     def open_settings(self):
         self.settings_window.show()
@@ -0,0 +1,128 @@
+from collections.abc import Iterable
+from typing import Protocol
+
+from PySide6.QtCore import QObject, Qt
+
+from kevinbotlib_dashboard.tracing import traced, tracer
+from kevinbotlib_dashboard.updates import FramePacer, TopicUpdateQueue
+
+
+class Bindable(Protocol):
+    follows_samples: bool
+
+    def bound_keys(self) -> Iterable[str]: ...
+
+    def data_changed(self, keys: set[str]): ...
+
+    def set_culled(self, culled: bool): ...
+
+
+class WidgetBindings(QObject):
+    """
+    Topic keys displayed by each grid widget.
+    Changes can be marked from any thread, they are collected until the next display frame and every affected
+    widget is then notified once with all of its changed keys.
+    Culled widgets are outside the viewport, their changes are held until they are visible again.
+    Widgets that `follows_samples` are also notified of received samples that didn't change the topic's value.
+    """
+
+    def __init__(self, frame_rate: float = 60, parent: QObject | None = None):
+        super().__init__(parent)
+
+        self._keys: dict[Bindable, frozenset[str]] = {}
+        self._subscribers: dict[str, set[Bindable]] = {}
+        self._sample_subscribers: dict[str, set[Bindable]] = {}
+        self._culled: set[Bindable] = set()
+        self._missed: dict[Bindable, set[str]] = {}
+
+        self._changes = TopicUpdateQueue(self)
+        self._pacer = FramePacer(self.flush, frame_rate, self)
+        self._changes.updated.connect(self._pacer.schedule, Qt.ConnectionType.QueuedConnection)
+        self._samples = TopicUpdateQueue(self)
+        self._samples.updated.connect(self._pacer.schedule, Qt.ConnectionType.QueuedConnection)
+
+    def bind(self, widget: Bindable):
+        """Subscribe a widget to its `bound_keys`, replacing any previous subscription"""
+        self.unbind(widget)
+        keys = frozenset(widget.bound_keys())
+        self._keys[widget] = keys
+        for key in keys:
+            self._subscribers.setdefault(key, set()).add(widget)
+            if widget.follows_samples:
+                self._sample_subscribers.setdefault(key, set()).add(widget)
+
+    def unbind(self, widget: Bindable):
+        self._culled.discard(widget)
+        self._missed.pop(widget, None)
+        for key in self._keys.pop(widget, ()):
+            for subscribers_by_key in (self._subscribers, self._sample_subscribers):
+                subscribers = subscribers_by_key.get(key)
+                if subscribers is None:
+                    continue
+                subscribers.discard(widget)
+                if not subscribers:
+                    del subscribers_by_key[key]
+
+    def widgets(self) -> list[Bindable]:
+        return list(self._keys)
+
+    def keys(self, widget: Bindable) -> frozenset[str]:
+        return self._keys.get(widget, frozenset())
+
+    def set_culled(self, culled: set[Bindable]):
+        """Replace the set of culled widgets, widgets that became visible get the changes they missed"""
+        culled = culled.intersection(self._keys)
+        for widget in culled - self._culled:
+            widget.set_culled(True)
+        revealed = self._culled - culled
+        self._culled = culled
+        for widget in revealed:
+            widget.set_culled(False)
+            keys = self._missed.pop(widget, None)
+            if keys:
+                widget.data_changed(keys)
+
+    def mark_changed(self, key: str):
+        """Notify the widgets bound to `key` that its value changed"""
+        if key in self._subscribers:
+            self._changes.mark_dirty(key)
+
+    def mark_all(self):
+        """Notify every widget on the next frame"""
+        self._changes.mark_all()
+
+    def mark_sampled(self, key: str):
+        """Notify the widgets following the samples of `key` that one was received"""
+        # Called from the client thread, racing with `bind` at most misses the first sample of a new widget
+        if key in self._sample_subscribers:
+            self._samples.mark_dirty(key)
+
+    def mark_all_sampled(self):
+        """Notify every widget following samples on the next frame, used when the sample history is reset"""
+        self._samples.mark_all()
+
+    @traced("bindings.flush")
+    def flush(self):
+        changed: dict[Bindable, set[str]] = {}
+        for queue, subscribers, followers_only in (
+            (self._changes, self._subscribers, False),
+            (self._samples, self._sample_subscribers, True),
+        ):
+            keys, resync = queue.take()
+            if resync:
+                for widget, widget_keys in self._keys.items():
+                    if widget.follows_samples or not followers_only:
+                        changed.setdefault(widget, set()).update(widget_keys)
+                continue
+            for key in keys:
+                for widget in subscribers.get(key, ()):
+                    changed.setdefault(widget, set()).add(key)
+
+        notified = 0
+        for widget, widget_keys in changed.items():
+            if widget in self._culled:
+                self._missed.setdefault(widget, set()).update(widget_keys)
+            else:
+                widget.data_changed(widget_keys)
+                notified += 1
+        tracer.counter("bound widgets changed", {"widgets": notified, "culled": len(changed) - notified})
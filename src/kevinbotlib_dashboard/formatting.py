@@ -0,0 +1,118 @@
+from collections.abc import Callable
+from typing import Any
+
+Formatter = Callable[[Any], Any]
+FormatterFactory = Callable[[str | None], Formatter]
+"""Builds a formatter from the argument after the `:` in a format string, `None` if there isn't one"""
+
+CompiledStruct = tuple[tuple[str, Formatter], ...]
+"""Pairs of element name and bound formatter"""
+
+_formats: dict[str, FormatterFactory] = {}
+_generation = 0
+
+
+def register_format(name: str, factory: FormatterFactory):
+    """
+    Register a custom viewable format.
+    A viewable with `"format": "name"` or `"format": "name:arg"` will be displayed with `factory(arg)`.
+    """
+    global _generation  # noqa: PLW0603
+    _formats[name] = factory
+    _generation += 1
+
+
+def _raw(_arg: str | None) -> Formatter:
+    return lambda raw: raw
+
+
+def _percent(_arg: str | None) -> Formatter:
+    return lambda raw: f"{raw * 100:.2f}%"
+
+
+def _degrees(_arg: str | None) -> Formatter:
+    return lambda raw: f"{raw}°"
+
+
+def _radians(_arg: str | None) -> Formatter:
+    return lambda raw: f"{raw} rad"
+
+
+def _limit(arg: str | None) -> Formatter:
+    # A bare or malformed "limit" shows the whole value
+    if arg is None or not arg.strip().isdigit():
+        return _raw(arg)
+    limit = int(arg)
+    return lambda raw: raw[:limit]
+
+
+register_format("raw", _raw)
+register_format("percent", _percent)
+register_format("degrees", _degrees)
+register_format("radians", _radians)
+register_format("limit", _limit)
+
+
+def _no_format(_raw: Any) -> str:
+    return ""
+
+
+def compile_viewable(fmt: str | None) -> Formatter:
+    if fmt is None:
+        return _no_format
+    name, sep, arg = fmt.partition(":")
+    factory = _formats.get(name, _raw)
+    return factory(arg if sep else None)
+
+
+def compile_struct(viewables: list[dict]) -> CompiledStruct:
+    return tuple(
+        (viewable["element"], compile_viewable(viewable.get("format")))
+        for viewable in viewables
+        if "element" in viewable
+    )
+
+
+class FormatterCache:
+    """Compiled `struct["dashboard"]` formatters by topic, recompiled only when a topic's struct changes"""
+
+    def __init__(self):
+        self._generation = _generation
+        self._topics: dict[str, tuple[dict, CompiledStruct]] = {}
+        self._compiled: dict[tuple, CompiledStruct] = {}
+
+    def get(self, key: str, struct: dict) -> CompiledStruct:
+        if self._generation != _generation:
+            # A format was registered since these were compiled
+            self.clear()
+
+        entry = self._topics.get(key)
+        if entry is not None and entry[0] == struct:
+            return entry[1]
+
+        viewables = struct["dashboard"]
+        # Topics of the same sendable type share one compiled list
+        signature = tuple((viewable.get("element"), viewable.get("format")) for viewable in viewables)
+        compiled = self._compiled.get(signature)
+        if compiled is None:
+            compiled = compile_struct(viewables)
+            self._compiled[signature] = compiled
+
+        self._topics[key] = (struct, compiled)
+        return compiled
+
+    def discard(self, key: str):
+        self._topics.pop(key, None)
+
+    def clear(self):
+        self._generation = _generation
+        self._topics.clear()
+        self._compiled.clear()
+
+    def format(self, key: str, value: dict) -> dict | None:
+        """Format the `struct["dashboard"]` viewables of a raw payload, `None` if it can't be displayed"""
+        struct = value.get("struct")
+        if not struct or "dashboard" not in struct:
+            self.discard(key)
+            return None
+        return {element: formatter(value[element]) for element, formatter in self.get(key, struct)}
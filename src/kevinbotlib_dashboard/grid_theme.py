@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from enum import Enum
 
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QColor, QPen
+
 
 @dataclass
 class ThemeOptions:
@@ -27,3 +30,24 @@ class Themes(Enum):
         primary="#4682b4",
         border="#d5d5d5",
     )
+
+
+class ThemePaint:
+    """Colors, brushes and pens of a theme, built once per theme change and shared by every item"""
+
+    def __init__(self, options: ThemeOptions):
+        self.options = options
+
+        self.background = QColor(options.background)
+        self.item_brush = QBrush(QColor(options.item_background))
+
+        primary = QColor(options.primary)
+        self.title_brush = QBrush(primary)
+        stale = QColor(primary)
+        # Washed out while the topic isn't updating
+        stale.setHsv(primary.hue(), primary.saturation() // 5, primary.value())
+        self.stale_title_brush = QBrush(stale)
+
+        self.text_pen = QPen(QColor(options.foreground))
+        self.plot_pen = QPen(primary, 1.5)
+        self.grid_pen = QPen(QColor(options.border), 1, Qt.PenStyle.DashLine)
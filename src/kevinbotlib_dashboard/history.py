@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy as np
+
+SAMPLE_BYTES = 16
+"""One float64 timestamp and one float64 value"""
+
+
+class RingBuffer:
+    """Fixed-size buffer of timestamped samples, the oldest sample is overwritten once it is full"""
+
+    __slots__ = ("count", "head", "times", "values")
+
+    def __init__(self, capacity: int):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.head = 0
+        """Index the next sample is written to"""
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.times)
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+    def append(self, timestamp: float, value: float):
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.times)
+        if self.count < len(self.times):
+            self.count += 1
+
+    def ordered(self) -> tuple[np.ndarray, np.ndarray]:
+        """Copies of the timestamps and values, oldest first"""
+        if self.count < len(self.times):
+            return self.times[: self.count].copy(), self.values[: self.count].copy()
+        return np.roll(self.times, -self.head), np.roll(self.values, -self.head)
+
+    def window(self, start: float, end: float) -> tuple[np.ndarray, np.ndarray]:
+        """Samples with `start <= timestamp <= end`, oldest first"""
+        times, values = self.ordered()
+        first = np.searchsorted(times, start, side="left")
+        last = np.searchsorted(times, end, side="right")
+        return times[first:last], values[first:last]
+
+    def latest(self) -> tuple[float, float] | None:
+        if self.count == 0:
+            return None
+        index = self.head - 1
+        return float(self.times[index]), float(self.values[index])
+
+
+class TopicHistory:
+    """
+    Recent numeric samples of every `struct["dashboard"]` element, one `RingBuffer` per topic element.
+    The buffers share a fixed memory budget, once it is used up the topics viewed least recently are evicted, topics
+    that were never viewed go first.
+    Samples are recorded from the client thread and read from the GUI thread.
+    """
+
+    def __init__(
+        self,
+        budget: int = 32 * 1024 * 1024,
+        capacity: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        """Samples kept per element"""
+        self.clock = clock
+        self._budget = budget
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+        # Both are ordered from the next topic to evict to the last
+        self._unviewed: OrderedDict[str, dict[str, RingBuffer]] = OrderedDict()
+        self._viewed: OrderedDict[str, dict[str, RingBuffer]] = OrderedDict()
+
+        self._elements: dict[tuple, tuple[str, ...]] = {}
+        """Elements named by each `struct["dashboard"]`, shared by topics of the same sendable type"""
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def set_budget(self, budget: int):
+        with self._lock:
+            self._budget = budget
+            self._evict(0)
+
+    def record(self, key: str, payload: dict, timestamp: float | None = None):
+        """Append the numeric viewables of a raw payload"""
+        struct = payload.get("struct")
+        if not struct or "dashboard" not in struct:
+            return
+        if timestamp is None:
+            timestamp = self.clock()
+
+        viewables = struct["dashboard"]
+        signature = tuple(viewable.get("element") for viewable in viewables)
+        elements = self._elements.get(signature)
+        if elements is None:
+            elements = tuple(element for element in signature if element is not None)
+            self._elements[signature] = elements
+
+        with self._lock:
+            buffers = self._viewed.get(key)
+            if buffers is None:
+                buffers = self._unviewed.get(key)
+            for element in elements:
+                value = payload.get(element)
+                # bool is an int, a switch is plotted as 0 and 1
+                if not isinstance(value, int | float):
+                    continue
+                if buffers is None or element not in buffers:
+                    buffers = self._allocate(key, element)
+                    if buffers is None:
+                        return
+                buffers[element].append(timestamp, value)
+
+    def _allocate(self, key: str, element: str) -> dict[str, RingBuffer] | None:
+        buffer = RingBuffer(self.capacity)
+        if not self._evict(buffer.nbytes, key):
+            return None
+
+        buffers = self._viewed.get(key)
+        if buffers is None:
+            buffers = self._unviewed.setdefault(key, {})
+        buffers[element] = buffer
+        self._nbytes += buffer.nbytes
+        return buffers
+
+    def _evict(self, needed: int, keep: str | None = None) -> bool:
+        """Free whole topics until `needed` more bytes fit in the budget, returns whether they do"""
+        for topics in (self._unviewed, self._viewed):
+            while self._nbytes + needed > self._budget:
+                key = next((key for key in topics if key != keep), None)
+                if key is None:
+                    break
+                self._release(topics.pop(key))
+        return self._nbytes + needed <= self._budget
+
+    def _release(self, buffers: dict[str, RingBuffer]):
+        self._nbytes -= sum(buffer.nbytes for buffer in buffers.values())
+
+    def discard(self, key: str):
+        with self._lock:
+            for topics in (self._unviewed, self._viewed):
+                buffers = topics.pop(key, None)
+                if buffers is not None:
+                    self._release(buffers)
+
+    def clear(self):
+        with self._lock:
+            self._unviewed.clear()
+            self._viewed.clear()
+            self._nbytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._viewed or key in self._unviewed
+
+    def mark_viewed(self, key: str):
+        """Move a topic to the back of the eviction order"""
+        with self._lock:
+            self._touch(key)
+
+    def _touch(self, key: str) -> dict[str, RingBuffer] | None:
+        buffers = self._unviewed.pop(key, None)
+        if buffers is not None:
+            self._viewed[key] = buffers
+            return buffers
+        buffers = self._viewed.get(key)
+        if buffers is not None:
+            self._viewed.move_to_end(key)
+        return buffers
+
+    def elements(self, key: str) -> list[str]:
+        """Elements of a topic that have history"""
+        with self._lock:
+            buffers = self._viewed.get(key) or self._unviewed.get(key) or {}
+            return list(buffers)
+
+    def window(self, key: str, element: str, seconds: float, end: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Timestamps and values of one element over the `seconds` before `end`, oldest first.
+        Reading a topic counts as viewing it.
+        """
+        if end is None:
+            end = self.clock()
+        with self._lock:
+            buffers = self._touch(key)
+            buffer = buffers.get(element) if buffers else None
+            if buffer is None:
+                return np.empty(0), np.empty(0)
+            return buffer.window(end - seconds, end)
+
+    def windows(self, key: str, seconds: float, end: float | None = None) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """`window` for every element of a topic"""
+        if end is None:
+            end = self.clock()
+        with self._lock:
+            buffers = self._touch(key) or {}
+            return {element: buffer.window(end - seconds, end) for element, buffer in buffers.items()}
+
+    def latest(self, key: str, element: str) -> tuple[float, float] | None:
+        with self._lock:
+            buffers = self._touch(key)
+            buffer = buffers.get(element) if buffers else None
+            return buffer.latest() if buffer is not None else None
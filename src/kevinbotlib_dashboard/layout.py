@@ -0,0 +1,171 @@
+"""
+Versioned layout file.
+
+The file is a JSON object with a `version` and the list of `widgets`. Older versions are upgraded on load through
+`MIGRATIONS`, version 1 is the bare widget list the dashboard used to keep in QSettings.
+"""
+
+import json
+import os
+import queue
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from kevinbotlib.logger import Logger
+from PySide6.QtCore import QObject, QStandardPaths, QTimer, Signal
+
+from kevinbotlib_dashboard.tracing import tracer
+
+LAYOUT_VERSION = 2
+
+
+class LayoutError(Exception):
+    pass
+
+
+def _v1_to_v2(document: dict) -> dict:
+    # Positions were saved as floats from dividing scene coordinates
+    for widget in document["widgets"]:
+        widget["pos"] = [int(widget["pos"][0]), int(widget["pos"][1])]
+    return document
+
+
+MIGRATIONS: dict[int, Callable[[dict], dict]] = {1: _v1_to_v2}
+"""Upgrade from each version to the next one"""
+
+
+def default_layout_path() -> Path:
+    config = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericConfigLocation)
+    return Path(config) / "kevinbotlib" / "dashboard-layout.json"
+
+
+def migrate_layout(document: dict | list) -> list[dict]:
+    """Widgets of a layout document of any known version"""
+    if isinstance(document, list):
+        document = {"version": 1, "widgets": document}
+    version = document.get("version")
+    if not isinstance(version, int) or version < 1:
+        msg = f"Invalid layout version {version!r}"
+        raise LayoutError(msg)
+    if version > LAYOUT_VERSION:
+        msg = f"Layout version {version} is newer than the supported version {LAYOUT_VERSION}"
+        raise LayoutError(msg)
+    while version < LAYOUT_VERSION:
+        document = MIGRATIONS[version](document)
+        version += 1
+    return document["widgets"]
+
+
+def read_layout(path: Path) -> list[dict] | None:
+    """Widgets saved in a layout file, `None` if it doesn't exist"""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    try:
+        return migrate_layout(json.loads(text))
+    except (ValueError, KeyError, TypeError) as e:
+        msg = f"Could not read layout {path}: {e!r}"
+        raise LayoutError(msg) from e
+
+
+def write_layout(path: Path, widgets: list[dict]):
+    """Replace the layout file atomically, a crash leaves either the old or the new file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = json.dumps({"version": LAYOUT_VERSION, "widgets": widgets}, separators=(",", ":"))
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        Path(temp).unlink(missing_ok=True)
+        raise
+
+
+class LayoutStore(QObject):
+    """
+    Autosaves the layout a short while after it last changed.
+    The widget list is taken on the GUI thread, serializing and writing happen in a background thread.
+    """
+
+    saved = Signal()
+    failed = Signal(str)
+
+    def __init__(self, path: Path, snapshot: Callable[[], list[dict]], debounce: int = 1000, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.snapshot = snapshot
+        self.logger = Logger()
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce)
+        self.debounce_timer.timeout.connect(self.save)
+
+        self._queue: queue.SimpleQueue[list[dict] | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="KevinbotLib.Dashboard.LayoutSaver", daemon=True)
+        self._thread.start()
+
+    def load(self) -> list[dict] | None:
+        """
+        Widgets of the layout file, `None` if there isn't one.
+        An unreadable file is kept next to the new one so it isn't lost to the next autosave.
+        """
+        try:
+            return read_layout(self.path)
+        except LayoutError as e:
+            self.logger.error(str(e))
+            backup = self.path.with_name(self.path.name + ".unreadable")
+            try:
+                self.path.replace(backup)
+            except OSError as move_error:
+                self.logger.error(f"Could not move unreadable layout to {backup}: {move_error!r}")
+                self.failed.emit(f"The layout {self.path} could not be read and will be replaced on the next save")
+            else:
+                self.failed.emit(f"The layout could not be read and was moved to {backup}")
+            return None
+
+    def schedule(self):
+        """Save once the layout has stopped changing for the debounce interval"""
+        self.debounce_timer.start()
+
+    def save(self):
+        self.debounce_timer.stop()
+        with tracer.span("layout.save"):
+            self._queue.put(self.snapshot())
+
+    def stop(self):
+        """Write any pending change and wait for the writer, used on exit"""
+        if self.debounce_timer.isActive():
+            self.save()
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            widgets = self._queue.get()
+            # Only the newest of several queued snapshots needs writing
+            stopping = widgets is None
+            while not self._queue.empty():
+                newer = self._queue.get()
+                if newer is None:
+                    stopping = True
+                else:
+                    widgets = newer
+            if widgets is not None:
+                try:
+                    with tracer.span("layout.write"):
+                        write_layout(self.path, widgets)
+                except OSError as e:
+                    self.logger.error(f"Could not save layout to {self.path}: {e!r}")
+                    self.failed.emit(str(e))
+                else:
+                    self.saved.emit()
+            if stopping:
+                return
@@ -0,0 +1,154 @@
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import override
+
+import numpy as np
+from PySide6.QtCore import QPointF, QSize
+from PySide6.QtGui import QPainter, QPaintEvent, QPalette, QPen
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from kevinbotlib_dashboard.history import RingBuffer
+
+
+@dataclass
+class LatencyStats:
+    last: float
+    min: float
+    avg: float
+    p95: float
+    max: float
+    jitter: float
+    """Mean difference between consecutive samples"""
+
+
+class LatencyMonitor:
+    """Fixed-size window of latency samples"""
+
+    def __init__(self, window: int = 120):
+        self.samples = RingBuffer(window)
+
+    def add(self, latency: float, timestamp: float | None = None):
+        self.samples.append(time.monotonic() if timestamp is None else timestamp, latency)
+
+    def values(self) -> np.ndarray:
+        return self.samples.ordered()[1]
+
+    def stats(self) -> LatencyStats | None:
+        values = self.values()
+        if not len(values):
+            return None
+        return LatencyStats(
+            float(values[-1]),
+            float(values.min()),
+            float(values.mean()),
+            float(np.percentile(values, 95)),
+            float(values.max()),
+            float(np.abs(np.diff(values)).mean()) if len(values) > 1 else 0.0,
+        )
+
+
+class TopicAges:
+    """
+    Time of the last update of every topic, kept in one array so the ages of all topics are computed in a single
+    vectorized pass.
+    Updates are recorded from the client thread.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, capacity: int = 256):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._slots: dict[str, int] = {}
+        self._keys: list[str | None] = [None] * capacity
+        self._times = np.full(capacity, np.nan)
+        """NaN marks a free slot"""
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def touch(self, key: str, timestamp: float | None = None):
+        if timestamp is None:
+            timestamp = self.clock()
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._allocate(key)
+            self._times[slot] = timestamp
+
+    def _allocate(self, key: str) -> int:
+        if not self._free:
+            capacity = len(self._times)
+            self._times = np.concatenate((self._times, np.full(capacity, np.nan)))
+            self._keys.extend([None] * capacity)
+            self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+        slot = self._free.pop()
+        self._slots[key] = slot
+        self._keys[slot] = key
+        return slot
+
+    def discard(self, key: str):
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                return
+            self._keys[slot] = None
+            self._times[slot] = np.nan
+            self._free.append(slot)
+
+    def clear(self):
+        with self._lock:
+            for slot in self._slots.values():
+                self._keys[slot] = None
+                self._times[slot] = np.nan
+                self._free.append(slot)
+            self._slots.clear()
+
+    def age(self, key: str, now: float | None = None) -> float | None:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return None
+            return (self.clock() if now is None else now) - float(self._times[slot])
+
+    def stale(self, threshold: float, now: float | None = None) -> set[str]:
+        """Keys not updated for more than `threshold` seconds"""
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            # Free slots are NaN, which never compares greater
+            slots = np.flatnonzero(now - self._times > threshold)
+            return {self._keys[slot] for slot in slots.tolist()}  # type: ignore
+
+
+class Sparkline(QWidget):
+    """Small line chart of recent values, scaled to their own range"""
+
+    def __init__(self, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.values = np.empty(0)
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+
+    @override
+    def sizeHint(self) -> QSize:
+        return QSize(80, 16)
+
+    def set_values(self, values: np.ndarray):
+        self.values = values
+        self.update()
+
+    @override
+    def paintEvent(self, event: QPaintEvent):
+        if len(self.values) < 2:  # noqa: PLR2004
+            return
+
+        low, high = float(self.values.min()), float(self.values.max())
+        width, height = self.width() - 2, self.height() - 2
+        xs = 1 + np.linspace(0, width, len(self.values))
+        ys = 1 + height - (self.values - low) * (height / ((high - low) or 1.0))
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self.palette().color(QPalette.ColorRole.Highlight), 1.2))
+        painter.drawPolyline([QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist(), strict=True)])
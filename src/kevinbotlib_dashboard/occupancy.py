@@ -0,0 +1,135 @@
+from collections.abc import Hashable, Iterator
+
+import numpy as np
+
+Cell = tuple[int, int, int, int]
+"""Column, row, span x and span y of a widget"""
+
+
+class OccupancyGrid:
+    """
+    Which widget covers each cell of the dashboard grid.
+    Layout checks are array lookups instead of scene queries, cells hold a per-widget id and 0 when empty.
+    """
+
+    def __init__(self, rows: int, cols: int):
+        self.cells = np.zeros((rows, cols), dtype=np.int32)
+        self._ids: dict[Hashable, int] = {}
+        self._items: dict[int, Hashable] = {}
+        self._rects: dict[int, Cell] = {}
+        self._next_id = 1
+
+    @property
+    def rows(self) -> int:
+        return self.cells.shape[0]
+
+    @property
+    def cols(self) -> int:
+        return self.cells.shape[1]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._ids
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Widgets in the order they were placed"""
+        return iter(self._ids)
+
+    def rect(self, item: Hashable) -> Cell | None:
+        widget_id = self._ids.get(item)
+        return None if widget_id is None else self._rects[widget_id]
+
+    def place(self, item: Hashable, x: int, y: int, span_x: int, span_y: int):
+        """Mark the cells covered by `item`, replacing its previous cells"""
+        widget_id = self._ids.get(item)
+        if widget_id is None:
+            widget_id = self._ids[item] = self._next_id
+            self._items[widget_id] = item
+            self._next_id += 1
+        else:
+            self._clear(widget_id)
+        x, y = max(0, x), max(0, y)
+        self.cells[y : y + span_y, x : x + span_x] = widget_id
+        self._rects[widget_id] = (x, y, span_x, span_y)
+
+    def remove(self, item: Hashable):
+        widget_id = self._ids.pop(item, None)
+        if widget_id is not None:
+            self._clear(widget_id)
+            del self._rects[widget_id]
+            del self._items[widget_id]
+
+    def _clear(self, widget_id: int):
+        x, y, span_x, span_y = self._rects[widget_id]
+        region = self.cells[y : y + span_y, x : x + span_x]
+        region[region == widget_id] = 0
+
+    def clear(self):
+        self.cells.fill(0)
+        self._ids.clear()
+        self._items.clear()
+        self._rects.clear()
+
+    def items_in(self, x: int, y: int, width: int, height: int) -> list[Hashable]:
+        """Widgets covering at least one cell of the area"""
+        region = self.cells[max(0, y) : max(0, y + height), max(0, x) : max(0, x + width)]
+        return [self._items[widget_id] for widget_id in np.unique(region).tolist() if widget_id]
+
+    def is_free(self, x: int, y: int, span_x: int, span_y: int, ignore: Hashable | None = None) -> bool:
+        """Whether the area is inside the grid and not covered by any widget other than `ignore`"""
+        if x < 0 or y < 0 or x + span_x > self.cols or y + span_y > self.rows:
+            return False
+        region = self.cells[y : y + span_y, x : x + span_x]
+        ignored = self._ids.get(ignore, 0) if ignore is not None else 0
+        if ignored:
+            return not np.any((region != 0) & (region != ignored))
+        return not region.any()
+
+    def can_move(self, moves: dict[Hashable, Cell]) -> bool:
+        """Whether widgets can all be moved to new cells at once, the cells they leave count as free"""
+        moving = [self._ids[item] for item in moves if item in self._ids]
+        taken = (self.cells != 0) & ~np.isin(self.cells, moving)
+        for x, y, span_x, span_y in moves.values():
+            if x < 0 or y < 0 or x + span_x > self.cols or y + span_y > self.rows:
+                return False
+            region = taken[y : y + span_y, x : x + span_x]
+            if region.any():
+                return False
+            # Moved widgets can't overlap each other either
+            region[...] = True
+        return True
+
+    def find_free(self, span_x: int, span_y: int) -> tuple[int, int] | None:
+        """First free column and row for the area scanning row by row, `None` if the grid has no room"""
+        rows, cols = self.cells.shape
+        if span_x > cols or span_y > rows or span_x < 1 or span_y < 1:
+            return None
+
+        # Summed-area table, every candidate area's covered cell count is four lookups
+        integral = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+        integral[1:, 1:] = (self.cells != 0).cumsum(axis=0).cumsum(axis=1)
+        last_row, last_col = rows - span_y + 1, cols - span_x + 1
+        covered = (
+            integral[span_y:, span_x:]
+            - integral[:last_row, span_x:]
+            - integral[span_y:, :last_col]
+            + integral[:last_row, :last_col]
+        )
+        free = np.flatnonzero(covered == 0)
+        if not len(free):
+            return None
+        row, col = divmod(int(free[0]), last_col)
+        return col, row
+
+    def fits(self, rows: int, cols: int) -> bool:
+        """Whether every widget is inside a grid of the given size"""
+        return not self.cells[rows:, :].any() and not self.cells[:, cols:].any()
+
+    def resize(self, rows: int, cols: int):
+        """Change the grid size, every widget must fit in the new size"""
+        cells = np.zeros((rows, cols), dtype=np.int32)
+        keep_rows, keep_cols = min(rows, self.rows), min(cols, self.cols)
+        cells[:keep_rows, :keep_cols] = self.cells[:keep_rows, :keep_cols]
+        self.cells = cells
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import override
+
+import numpy as np
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QHideEvent, QShowEvent
+from PySide6.QtWidgets import QLabel, QWidget
+
+from kevinbotlib_dashboard.history import RingBuffer
+from kevinbotlib_dashboard.tracing import traced, tracer
+
+TIMINGS = {"ingest": "Ingest", "format": "Format", "model": "Model", "paint": "Paint"}
+"""Stages measured in seconds, by display name"""
+COUNTS = {"dirty": "Dirty topics", "repainted": "Items repainted"}
+"""Stages counted per update or frame, by display name"""
+PERCENTILES = (50, 95, 99)
+
+
+class PerfStats:
+    """
+    Rolling samples of the time spent in each stage of the update pipeline.
+    Recording is a no-op until `enabled` is set, samples can come from any thread.
+    Timed stages are also traced while the tracer is running.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.enabled = False
+        self.capacity = capacity
+        """Samples kept per stage"""
+        self.painted = 0
+        """Items painted since the view started its current paint"""
+
+        self._lock = threading.Lock()
+        self._samples: dict[str, RingBuffer] = {}
+
+    def record(self, stage: str, value: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            buffer = self._samples.get(stage)
+            if buffer is None:
+                buffer = self._samples[stage] = RingBuffer(self.capacity)
+            buffer.append(time.monotonic(), value)
+
+    def record_span(self, stage: str, start: float, end: float):
+        """Record a stage timed with `time.perf_counter`"""
+        self.record(stage, end - start)
+        tracer.complete(stage, start, end)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        if not self.enabled and not tracer.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(stage, start, time.perf_counter())
+
+    def samples(self, stage: str) -> tuple[np.ndarray, np.ndarray]:
+        """Timestamps and values of a stage, oldest first"""
+        with self._lock:
+            buffer = self._samples.get(stage)
+            if buffer is None:
+                return np.empty(0), np.empty(0)
+            return buffer.ordered()
+
+    def percentiles(self, stage: str) -> np.ndarray | None:
+        """p50, p95 and p99 of a stage, `None` without samples"""
+        _times, values = self.samples(stage)
+        if not len(values):
+            return None
+        return np.percentile(values, PERCENTILES)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def dump(self, path: str):
+        """Write every sample to a JSON file, timings are in seconds"""
+        with self._lock:
+            stages = {stage: buffer.ordered() for stage, buffer in self._samples.items()}
+        report = {
+            "percentiles": list(PERCENTILES),
+            "stages": {
+                stage: {
+                    "times": times.tolist(),
+                    "values": values.tolist(),
+                    "percentiles": np.percentile(values, PERCENTILES).tolist() if len(values) else None,
+                }
+                for stage, (times, values) in stages.items()
+            },
+        }
+        with open(path, "w") as file:
+            json.dump(report, file)
+
+
+stats = PerfStats()
+"""Shared by the pipeline stages of the dashboard"""
+
+
+class PerfHud(QLabel):
+    """Compact p95 summary of `PerfStats` for the status bar, the tooltip has every percentile"""
+
+    def __init__(self, perf_stats: PerfStats, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.perf_stats = perf_stats
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+
+    @override
+    def showEvent(self, event: QShowEvent):
+        self.perf_stats.enabled = True
+        self.timer.start()
+        self.refresh()
+        super().showEvent(event)
+
+    @override
+    def hideEvent(self, event: QHideEvent):
+        self.perf_stats.enabled = False
+        self.timer.stop()
+        super().hideEvent(event)
+
+    @traced("perf_hud.refresh")
+    def refresh(self):
+        parts = []
+        rows = []
+        for stage, name in (TIMINGS | COUNTS).items():
+            percentiles = self.perf_stats.percentiles(stage)
+            if percentiles is None:
+                continue
+            if stage in TIMINGS:
+                parts.append(f"{name} {percentiles[1] * 1000:.1f}ms")
+                cells = "".join(f"<td align='right'>{value * 1000:.2f} ms</td>" for value in percentiles)
+            else:
+                parts.append(f"{percentiles[1]:.0f} {name.lower()}")
+                cells = "".join(f"<td align='right'>{value:.0f}</td>" for value in percentiles)
+            rows.append(f"<tr><td>{name}</td>{cells}</tr>")
+
+        self.setText(f"p95: {' | '.join(parts)}" if parts else "p95: No samples")
+        header = "".join(f"<th>p{percentile}</th>" for percentile in PERCENTILES)
+        self.setToolTip(f"<table><tr><th></th>{header}</tr>{''.join(rows)}</table>")
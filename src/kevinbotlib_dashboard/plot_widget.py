@@ -0,0 +1,134 @@
+from typing import override
+
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF, Qt, QTimer
+from PySide6.QtGui import QPainter
+from PySide6.QtWidgets import QGraphicsObject, QStyleOptionGraphicsItem, QWidget
+
+from kevinbotlib_dashboard.app import GridGraphicsView, WidgetItem
+from kevinbotlib_dashboard.history import TopicHistory
+from kevinbotlib_dashboard.plot import decimate
+from kevinbotlib_dashboard.registry import WidgetContext
+from kevinbotlib_dashboard.tracing import traced
+
+
+class PlotWidgetItem(WidgetItem):
+    """Scrolling plot of one numeric element of a topic, drawn from the topic history"""
+
+    default_span = (4, 3)
+    frame_rate = 30
+    """Maximum repaints per second"""
+    follows_samples = True
+
+    def __init__(self, title: str, grid: GridGraphicsView, history: TopicHistory, span_x=4, span_y=3, data=None):
+        super().__init__(title, grid, span_x, span_y, data)
+        self.kind = "plot"
+
+        self.history = history
+        self.element: str = self.info.get("element", "value")
+        self.duration: float = self.info.get("duration", 10)
+        """Seconds of history shown across the plot"""
+
+        self.last_sample: tuple[float, float] | None = None
+        self.drawn_empty = True
+
+        # Samples can arrive thousands of times per second, the plot is only redrawn once per frame.
+        # The timer keeps the plot scrolling and stops once every sample has scrolled out.
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(1000 // self.frame_rate)
+        self.frame_timer.timeout.connect(self.next_frame)
+
+    @override
+    @classmethod
+    def create(cls, context: WidgetContext, title: str, span_x: int, span_y: int, data: dict) -> "PlotWidgetItem":
+        return cls(title, context.view, context.history, span_x, span_y, data)
+
+    @override
+    @classmethod
+    def topic_info(cls, key: str, raw: dict) -> dict | None:
+        # Plot the first numeric element, the tree's context menu offers the others
+        for viewable in raw.get("struct", {}).get("dashboard", []):
+            element = viewable.get("element")
+            if isinstance(raw.get(element), int | float):
+                return {"topic": key, "element": element}
+        return None
+
+    def plot_rect(self) -> QRectF:
+        return QRectF(
+            self.margin + 8, self.margin + 38, self.width - 2 * self.margin - 16, self.height - 2 * self.margin - 46
+        )
+
+    @override
+    def itemChange(self, change: QGraphicsObject.GraphicsItemChange, value):
+        if change == QGraphicsObject.GraphicsItemChange.ItemSceneHasChanged:
+            if value is None:
+                self.frame_timer.stop()
+            else:
+                self.frame_timer.start()
+        return super().itemChange(change, value)
+
+    @override
+    def data_changed(self, _keys: set[str]):
+        # Zoomed out the plot isn't drawn, the next detailed paint catches up from the history
+        if not self.frame_timer.isActive() and self.scene() is not None and self.detailed:
+            self.frame_timer.start()
+
+    @override
+    def set_culled(self, culled: bool):
+        super().set_culled(culled)
+        if culled:
+            self.frame_timer.stop()
+        elif self.scene() is not None:
+            # Catch up with samples that arrived or scrolled while it was off-screen
+            self.frame_timer.start()
+
+    @traced("plot.next_frame")
+    def next_frame(self):
+        if self.topic is None:
+            self.frame_timer.stop()
+            return
+        latest = self.history.latest(self.topic, self.element)
+        if latest == self.last_sample and self.drawn_empty:
+            # Nothing new, and the old samples have already scrolled out
+            self.frame_timer.stop()
+            return
+        self.last_sample = latest
+        # Only the plot area changes, the title bar is left alone
+        self.update(self.plot_rect())
+
+    @override
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, /, widget: QWidget | None = None):  # type: ignore
+        super().paint(painter, option, widget)
+
+        rect = self.plot_rect()
+        self.drawn_empty = True
+        if not self.detailed:
+            self.frame_timer.stop()
+            return
+        if self.topic is None or rect.width() < 1 or rect.height() < 1:
+            return
+
+        end = self.history.clock()
+        times, values = self.history.window(self.topic, self.element, self.duration, end)
+        columns, lows, highs = decimate(times, values, end - self.duration, end, int(rect.width()))
+        finite = np.isfinite(lows) & np.isfinite(highs)
+        if not finite.any():
+            return
+        columns, lows, highs = columns[finite], lows[finite], highs[finite]
+        self.drawn_empty = False
+
+        low, high = float(lows.min()), float(highs.max())
+        scale = rect.height() / ((high - low) or 1.0)
+
+        # Each column goes from its minimum to its maximum, consecutive columns are joined by the polyline
+        points = np.empty((len(columns) * 2, 2))
+        points[:, 0] = np.repeat(rect.left() + columns + 0.5, 2)
+        points[0::2, 1] = rect.bottom() - (lows - low) * scale
+        points[1::2, 1] = rect.bottom() - (highs - low) * scale
+
+        painter.setPen(self.view.theme_paint.plot_pen)
+        painter.drawPolyline([QPointF(x, y) for x, y in points.tolist()])
+
+        painter.setPen(self.view.theme_paint.text_pen)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft, f"{high:.4g}")
+        painter.drawText(rect, Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft, f"{low:.4g}")
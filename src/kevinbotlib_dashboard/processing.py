@@ -0,0 +1,163 @@
+import time
+from dataclasses import dataclass, field
+
+from kevinbotlib.logger import Logger
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from kevinbotlib_dashboard import perf
+from kevinbotlib_dashboard.formatting import FormatterCache
+
+
+@dataclass
+class TopicSnapshot:
+    values: dict[str, dict | None]
+    """Raw payloads by key, `None` marks a deleted key"""
+    full: bool = False
+    """The snapshot holds every key, anything missing from it was removed"""
+
+    def merge(self, newer: "TopicSnapshot"):
+        if newer.full:
+            self.values = dict(newer.values)
+            self.full = True
+        else:
+            self.values.update(newer.values)
+
+
+@dataclass
+class TopicDiff:
+    updated: dict[str, dict] = field(default_factory=dict)
+    """Formatted viewables by key for new or changed topics"""
+    removed: list[str] = field(default_factory=list)
+    tree: dict | None = None
+    """Complete hierarchy, only set for full snapshots"""
+
+    def __bool__(self) -> bool:
+        return bool(self.updated or self.removed)
+
+
+def to_hierarchical_dict(flat_dict: dict) -> dict:
+    """Convert a flat dictionary into a hierarchical one based on '/'."""
+    hierarchical_dict = {}
+    for key, value in flat_dict.items():
+        parts = key.split("/")
+        d = hierarchical_dict
+        for part in parts[:-1]:
+            d = d.setdefault(part, {})
+        d[parts[-1]] = {"items": value, "key": key}
+    return hierarchical_dict
+
+
+class TopicProcessor(QObject):
+    """Turns raw snapshots into model diffs, lives in the pipeline's worker thread"""
+
+    processed = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.logger = Logger()
+        self.formatters = FormatterCache()
+        self.topics: dict[str, dict] = {}
+        self.payloads: dict[str, dict] = {}
+        """Last raw payload processed for each key"""
+
+    @Slot(object)
+    def process(self, snapshot: TopicSnapshot):
+        started = time.perf_counter()
+        diff = TopicDiff()
+        # The pipeline waits for every snapshot to be answered, even a failed one
+        try:
+            self._process(snapshot, diff)
+        finally:
+            perf.stats.record_span("format", started, time.perf_counter())
+            self.processed.emit(diff)
+
+    def _process(self, snapshot: TopicSnapshot, diff: TopicDiff):
+        if snapshot.full:
+            for key in [key for key in self.payloads if key not in snapshot.values]:
+                del self.payloads[key]
+                self.formatters.discard(key)
+                if self.topics.pop(key, None) is not None:
+                    diff.removed.append(key)
+
+        for key, value in snapshot.values.items():
+            # Most topics are republished with the same payload, those skip formatting and the model entirely
+            last = self.payloads.get(key)
+            if value and last is not None and (last is value or last == value):
+                continue
+
+            if value:
+                self.payloads[key] = value
+                try:
+                    structured = self.formatters.format(key, value)
+                except Exception as e:  # noqa: BLE001
+                    # A malformed payload only hides its own topic
+                    self.logger.error(f"Could not format {key}: {e!r}")
+                    structured = None
+                else:
+                    if structured is None:
+                        self.logger.trace(f"Could not display {key}, it dosen't contain a structure")
+            else:
+                structured = None
+                self.payloads.pop(key, None)
+                self.formatters.discard(key)
+
+            if structured is None:
+                if self.topics.pop(key, None) is not None:
+                    diff.removed.append(key)
+                continue
+            self.topics[key] = structured
+            diff.updated[key] = structured
+
+        if snapshot.full and diff:
+            # Rebuilding the hierarchy in one pass is cheaper than inserting thousands of keys one by one
+            diff.tree = to_hierarchical_dict(self.topics)
+
+
+class TopicPipeline(QObject):
+    """
+    Runs a `TopicProcessor` in a worker thread.
+    Snapshots submitted while the worker is busy are coalesced so only the latest value of each key is processed.
+    """
+
+    diff_ready = Signal(object)
+    _submit = Signal(object)
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+
+        self.worker_thread = QThread()
+        self.worker_thread.setObjectName("KevinbotLib.Dashboard.TopicPipeline")
+        self.processor = TopicProcessor()
+        self.processor.moveToThread(self.worker_thread)
+
+        self._submit.connect(self.processor.process)
+        self.processor.processed.connect(self._on_processed)
+
+        self.busy = False
+        self.pending: TopicSnapshot | None = None
+
+        self.worker_thread.start()
+
+    def submit(self, snapshot: TopicSnapshot):
+        if self.busy:
+            if self.pending is None:
+                self.pending = snapshot
+            else:
+                self.pending.merge(snapshot)
+            return
+
+        self.busy = True
+        self._submit.emit(snapshot)
+
+    @Slot(object)
+    def _on_processed(self, diff: TopicDiff):
+        self.busy = False
+        self.diff_ready.emit(diff)
+
+        if self.pending is not None:
+            snapshot, self.pending = self.pending, None
+            self.submit(snapshot)
+
+    def stop(self):
+        self.worker_thread.quit()
+        self.worker_thread.wait()
@@ -0,0 +1,302 @@
+"""
+Telemetry log format.
+
+A log starts with `MAGIC` followed by records, each a `RECORD` header and `length` bytes of payload:
+
+- `KEY` names a key id, the payload is the UTF-8 key
+- `UPDATE` is a topic update, the payload is the JSON of the raw payload
+- `DELETE` is a topic deletion, without payload
+- `KEYFRAME` lists the latest `UPDATE` of every live key as packed `KEYFRAME_ENTRY`s, written every few seconds so
+  any point in the log can be restored without replaying it from the start
+- `INDEX` is written once when the log is closed, the payload is JSON with the key names and keyframe positions
+
+A closed log ends with a `FOOTER` pointing at its `INDEX`. Logs that weren't closed are indexed by scanning them.
+"""
+
+import json
+import queue
+import struct
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from kevinbotlib.logger import Logger
+
+MAGIC = b"KBDLOG\x00\x01"
+RECORD = struct.Struct("<BdII")
+"""Kind, timestamp, key id and payload length"""
+KEYFRAME_ENTRY = struct.Struct("<IQ")
+"""Key id and offset of its latest update"""
+FOOTER = struct.Struct("<Q8s")
+"""Offset of the index and `FOOTER_MAGIC`"""
+FOOTER_MAGIC = b"KBDINDEX"
+
+
+class RecordKind(IntEnum):
+    KEY = 0
+    UPDATE = 1
+    DELETE = 2
+    KEYFRAME = 3
+    INDEX = 4
+
+
+@dataclass
+class Record:
+    kind: RecordKind
+    timestamp: float
+    key_id: int
+    payload: bytes
+    end: int
+    """Offset of the next record"""
+
+
+class TelemetryRecorder:
+    """
+    Appends topic updates to a telemetry log.
+    Updates are queued from any thread, encoding and buffered writes happen in a background thread.
+    """
+
+    def __init__(self, path: str, keyframe_interval: float = 5.0, buffer_size: int = 1024 * 1024):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.logger = Logger()
+
+        self._queue: queue.SimpleQueue[tuple[RecordKind, float, str, dict | None] | None] = queue.SimpleQueue()
+        self._file = open(path, "wb", buffering=buffer_size)  # noqa: SIM115
+        self._file.write(MAGIC)
+
+        self._key_ids: dict[str, int] = {}
+        self._latest: dict[int, int] = {}
+        """Offset of the latest update of each live key"""
+        self._keyframes: list[tuple[float, int]] = []
+        self._next_keyframe: float | None = None
+        self._start: float | None = None
+        self._end: float | None = None
+
+        self._thread = threading.Thread(target=self._run, name="KevinbotLib.Dashboard.Recorder", daemon=True)
+        self._thread.start()
+
+    def record_update(self, key: str, payload: dict, timestamp: float | None = None):
+        self._queue.put((RecordKind.UPDATE, time.time() if timestamp is None else timestamp, key, payload))
+
+    def record_delete(self, key: str, timestamp: float | None = None):
+        self._queue.put((RecordKind.DELETE, time.time() if timestamp is None else timestamp, key, None))
+
+    def stop(self):
+        """Write the index and close the log, blocks until everything queued is written"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=1)
+                except queue.Empty:
+                    # Keep at most about a second of data in the buffer in case the dashboard dies
+                    self._file.flush()
+                    continue
+                if item is None:
+                    break
+                self._write_entry(*item)
+            self._write_index()
+        except OSError as e:
+            self.logger.error(f"Telemetry recording to {self.path} failed: {e!r}")
+        finally:
+            self._file.close()
+
+    def _write(self, kind: RecordKind, timestamp: float, key_id: int, payload: bytes = b"") -> int:
+        offset = self._file.tell()
+        self._file.write(RECORD.pack(kind, timestamp, key_id, len(payload)))
+        self._file.write(payload)
+        return offset
+
+    def _write_entry(self, kind: RecordKind, timestamp: float, key: str, payload: dict | None):
+        if self._start is None:
+            self._start = timestamp
+            self._next_keyframe = timestamp + self.keyframe_interval
+        elif timestamp >= self._next_keyframe:  # type: ignore
+            self._write_keyframe(timestamp)
+        self._end = timestamp
+
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._key_ids)
+            self._write(RecordKind.KEY, timestamp, key_id, key.encode())
+
+        if kind == RecordKind.UPDATE:
+            encoded = json.dumps(payload, separators=(",", ":")).encode()
+            self._latest[key_id] = self._write(kind, timestamp, key_id, encoded)
+        else:
+            self._latest.pop(key_id, None)
+            self._write(kind, timestamp, key_id)
+
+    def _write_keyframe(self, timestamp: float):
+        payload = b"".join(KEYFRAME_ENTRY.pack(key_id, offset) for key_id, offset in self._latest.items())
+        self._keyframes.append((timestamp, self._write(RecordKind.KEYFRAME, timestamp, 0, payload)))
+        self._next_keyframe = timestamp + self.keyframe_interval
+
+    def _write_index(self):
+        index = {
+            "keys": list(self._key_ids),
+            "keyframes": self._keyframes,
+            "start": self._start,
+            "end": self._end,
+        }
+        offset = self._write(RecordKind.INDEX, self._end or 0.0, 0, json.dumps(index).encode())
+        self._file.write(FOOTER.pack(offset, FOOTER_MAGIC))
+
+
+@dataclass
+class LogIndex:
+    keys: list[str] = field(default_factory=list)
+    """Key names by id"""
+    keyframes: list[tuple[float, int]] = field(default_factory=list)
+    """Timestamp and offset of every keyframe"""
+    start: float = 0.0
+    end: float = 0.0
+    data_end: int = 0
+    """Offset where the records stop"""
+
+
+class TelemetryLog:
+    """Random access reader for a telemetry log"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")  # noqa: SIM115
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            msg = f"{path} is not a telemetry log"
+            raise ValueError(msg)
+
+        self.index = self._read_index() or self._scan()
+        self._keyframe_times = [timestamp for timestamp, _ in self.index.keyframes]
+
+    @property
+    def start(self) -> float:
+        return self.index.start
+
+    @property
+    def end(self) -> float:
+        return self.index.end
+
+    def close(self):
+        self._file.close()
+
+    def _read_index(self) -> LogIndex | None:
+        self._file.seek(0, 2)
+        size = self._file.tell()
+        if size < len(MAGIC) + FOOTER.size:
+            return None
+        self._file.seek(size - FOOTER.size)
+        offset, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+        if magic != FOOTER_MAGIC:
+            return None
+
+        record = self.read_at(offset)
+        if record is None or record.kind != RecordKind.INDEX:
+            return None
+        index = json.loads(record.payload)
+        return LogIndex(
+            index["keys"],
+            [tuple(keyframe) for keyframe in index["keyframes"]],
+            index["start"] or 0.0,
+            index["end"] or 0.0,
+            offset,
+        )
+
+    def _scan(self) -> LogIndex:
+        """Index a log that wasn't closed, reading only the record headers"""
+        index = LogIndex()
+        offset = len(MAGIC)
+        first = True
+        self._file.seek(offset)
+        while True:
+            header = self._file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            kind, timestamp, _key_id, length = RECORD.unpack(header)
+            if kind == RecordKind.KEY:
+                name = self._file.read(length)
+                if len(name) < length:
+                    break
+                index.keys.append(name.decode())
+            elif kind == RecordKind.INDEX:
+                break
+            else:
+                self._file.seek(length, 1)
+                if kind == RecordKind.KEYFRAME:
+                    index.keyframes.append((timestamp, offset))
+            if first:
+                index.start, first = timestamp, False
+            index.end = timestamp
+            offset += RECORD.size + length
+        # A record cut off by a crash is ignored
+        index.data_end = min(offset, self._file.seek(0, 2))
+        return index
+
+    def read_at(self, offset: int) -> Record | None:
+        self._file.seek(offset)
+        header = self._file.read(RECORD.size)
+        if len(header) < RECORD.size:
+            return None
+        kind, timestamp, key_id, length = RECORD.unpack(header)
+        payload = self._file.read(length)
+        if len(payload) < length:
+            return None
+        return Record(RecordKind(kind), timestamp, key_id, payload, offset + RECORD.size + length)
+
+    def records(self, offset: int) -> Iterator[Record]:
+        """Records from `offset` up to the index"""
+        while offset < self.index.data_end:
+            record = self.read_at(offset)
+            if record is None:
+                return
+            yield record
+            offset = record.end
+
+    def first_record(self) -> int:
+        return len(MAGIC)
+
+    def state_at(self, timestamp: float) -> tuple[dict[str, tuple[float, dict]], int]:
+        """
+        Latest timestamp and payload of every key that was live at `timestamp`, and the offset of the first record
+        after it
+        """
+        state: dict[str, tuple[float, dict]] = {}
+        offset = self.first_record()
+
+        position = bisect_right(self._keyframe_times, timestamp) - 1
+        if position >= 0:
+            keyframe = self.read_at(self.index.keyframes[position][1])
+            if keyframe is not None:
+                for key_id, update_offset in KEYFRAME_ENTRY.iter_unpack(keyframe.payload):
+                    update = self.read_at(update_offset)
+                    if update is not None:
+                        state[self.index.keys[key_id]] = (update.timestamp, json.loads(update.payload))
+                offset = keyframe.end
+
+        for record in self.records(offset):
+            if record.timestamp > timestamp:
+                return state, offset
+            self.apply(record, state)
+            offset = record.end
+        return state, offset
+
+    def apply(self, record: Record, state: dict[str, tuple[float, dict]]) -> str | None:
+        """Apply an update or delete to `state`, returns the key it changed"""
+        if record.kind == RecordKind.UPDATE:
+            key = self.index.keys[record.key_id]
+            state[key] = (record.timestamp, json.loads(record.payload))
+            return key
+        if record.kind == RecordKind.DELETE:
+            key = self.index.keys[record.key_id]
+            state.pop(key, None)
+            return key
+        return None
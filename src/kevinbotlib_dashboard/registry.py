@@ -0,0 +1,94 @@
+"""
+Registry of the widget kinds that can be placed on the grid.
+
+Third-party kinds are discovered through the `kevinbotlib_dashboard.widgets` entry point group, the entry point name is
+the kind saved in layouts and the object is a `WidgetItem` subclass:
+
+    [project.entry-points."kevinbotlib_dashboard.widgets"]
+    gauge = "my_package.gauge:GaugeWidgetItem"
+
+Modules are only imported the first time a widget of their kind is created.
+"""
+
+import importlib
+from dataclasses import dataclass
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING
+
+from kevinbotlib.logger import Logger
+
+if TYPE_CHECKING:
+    from kevinbotlib.comm import CommunicationClient
+
+    from kevinbotlib_dashboard.app import GridGraphicsView, WidgetItem
+    from kevinbotlib_dashboard.history import TopicHistory
+    from kevinbotlib_dashboard.monitoring import TopicAges
+
+ENTRY_POINT_GROUP = "kevinbotlib_dashboard.widgets"
+
+
+@dataclass
+class WidgetContext:
+    """Services of the dashboard available to widgets when they are created"""
+
+    view: "GridGraphicsView"
+    client: "CommunicationClient"
+    history: "TopicHistory"
+    ages: "TopicAges"
+
+
+_kinds: dict[str, "str | EntryPoint | type[WidgetItem]"] = {}
+"""Import path, entry point or loaded class of every kind"""
+_failed: set[str] = set()
+_discovered = False
+
+
+def register_kind(kind: str, target: "str | type[WidgetItem]"):
+    """Register a widget kind, `target` is a class or a `module:attribute` path imported on first use"""
+    _kinds[kind] = target
+    _failed.discard(kind)
+
+
+def _discover():
+    global _discovered  # noqa: PLW0603
+    if _discovered:
+        return
+    _discovered = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # Built-in kinds can't be replaced by a plugin
+        _kinds.setdefault(entry_point.name, entry_point)
+
+
+def kinds() -> list[str]:
+    """Names of every known kind, without importing any of them"""
+    _discover()
+    return sorted(_kinds)
+
+
+def load_kind(kind: str) -> "type[WidgetItem] | None":
+    """The class of a kind, `None` if it is unknown or fails to import"""
+    if kind not in _kinds:
+        _discover()
+    target = _kinds.get(kind)
+    if target is None or kind in _failed:
+        return None
+    if isinstance(target, type):
+        return target
+
+    try:
+        if isinstance(target, EntryPoint):
+            loaded = target.load()
+        else:
+            module, _, attribute = target.partition(":")
+            loaded = getattr(importlib.import_module(module), attribute)
+    except Exception as e:  # noqa: BLE001
+        Logger().error(f"Could not load widget kind {kind!r} from {target!r}: {e!r}")
+        _failed.add(kind)
+        return None
+
+    _kinds[kind] = loaded
+    return loaded
+
+
+register_kind("base", "kevinbotlib_dashboard.app:WidgetItem")
+register_kind("plot", "kevinbotlib_dashboard.plot_widget:PlotWidgetItem")
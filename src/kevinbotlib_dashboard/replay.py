@@ -0,0 +1,207 @@
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import qtawesome as qta
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QPushButton, QSlider, QWidget
+
+from kevinbotlib_dashboard.recording import RecordKind, TelemetryLog
+from kevinbotlib_dashboard.tracing import traced
+
+
+class ReplaySource(QObject):
+    """
+    Plays a telemetry log back through the same `get_keys`/`get_raw` surface as `CommunicationClient`.
+    Updates are delivered to `on_update` and `on_delete` like the client's callbacks, but from the GUI thread.
+    """
+
+    reset = Signal()
+    """The data store was replaced, every key has to be reprocessed"""
+    position_changed = Signal(float)
+    playing_changed = Signal(bool)
+
+    frame_interval = 16
+    """Milliseconds between playback steps"""
+
+    def __init__(
+        self,
+        path: str,
+        on_update: Callable[[str, Any], None] | None = None,
+        on_delete: Callable[[str], None] | None = None,
+        parent: QObject | None = None,
+    ):
+        super().__init__(parent)
+        self.log = TelemetryLog(path)
+        self.on_update = on_update
+        self.on_delete = on_delete
+
+        self.data_store: dict[str, dict] = {}
+        self.websocket = None
+
+        self.speed = 1.0
+        self.position = self.log.start
+        self._offset = self.log.first_record()
+        self._played_at = 0.0
+        """Monotonic time the position was last advanced"""
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.frame_interval)
+        self.timer.timeout.connect(self._step)
+
+    @property
+    def start(self) -> float:
+        return self.log.start
+
+    @property
+    def end(self) -> float:
+        return self.log.end
+
+    @property
+    def playing(self) -> bool:
+        return self.timer.isActive()
+
+    def time(self) -> float:
+        """Current position in log time"""
+        if self.playing:
+            return min(self.position + (time.monotonic() - self._played_at) * self.speed, self.end)
+        return self.position
+
+    def get_keys(self) -> list[str]:
+        return list(self.data_store.keys())
+
+    def get_raw(self, key: str) -> dict | None:
+        entry = self.data_store.get(key)
+        return entry["data"] if entry else None
+
+    def play(self):
+        if self.playing:
+            return
+        if self.position >= self.end:
+            self.seek(self.start)
+        self._played_at = time.monotonic()
+        self.timer.start()
+        self.playing_changed.emit(True)
+
+    def pause(self):
+        if not self.playing:
+            return
+        self._step()
+        self.timer.stop()
+        self.playing_changed.emit(False)
+
+    def set_speed(self, speed: float):
+        if self.playing:
+            self._step()
+        self.speed = speed
+
+    def seek(self, position: float):
+        """Jump to `position`, restoring every topic from the nearest keyframe"""
+        position = max(self.start, min(position, self.end))
+        state, self._offset = self.log.state_at(position)
+        self.data_store = {key: {"data": data, "tsu": ts, "tsc": ts} for key, (ts, data) in state.items()}
+        self.position = position
+        self._played_at = time.monotonic()
+        self.reset.emit()
+        self.position_changed.emit(position)
+
+    @traced("replay.step")
+    def _step(self):
+        now = time.monotonic()
+        position = min(self.position + (now - self._played_at) * self.speed, self.end)
+        self._played_at = now
+
+        for record in self.log.records(self._offset):
+            if record.timestamp > position:
+                break
+            self._offset = record.end
+            if record.kind == RecordKind.UPDATE:
+                key = self.log.index.keys[record.key_id]
+                previous = self.data_store.get(key)
+                entry = {
+                    "data": json.loads(record.payload),
+                    "tsu": record.timestamp,
+                    "tsc": previous["tsc"] if previous else record.timestamp,
+                }
+                self.data_store[key] = entry
+                if self.on_update:
+                    self.on_update(key, entry)
+            elif record.kind == RecordKind.DELETE:
+                key = self.log.index.keys[record.key_id]
+                if self.data_store.pop(key, None) is not None and self.on_delete:
+                    self.on_delete(key)
+
+        self.position = position
+        self.position_changed.emit(position)
+        if position >= self.end and self.playing:
+            self.timer.stop()
+            self.playing_changed.emit(False)
+
+    def close(self):
+        self.timer.stop()
+        self.log.close()
+
+
+class ReplayControls(QWidget):
+    speeds = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+
+    def __init__(self, source: ReplaySource, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.source = source
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 0, 4, 0)
+
+        self.play_button = QPushButton(qta.icon("mdi6.play"), "")
+        self.play_button.setToolTip("Play")
+        self.play_button.clicked.connect(self.toggle)
+        layout.addWidget(self.play_button)
+
+        self.speed = QComboBox()
+        for speed in self.speeds:
+            self.speed.addItem(f"{speed:g}x", speed)
+        self.speed.setCurrentIndex(self.speeds.index(1.0))
+        self.speed.currentIndexChanged.connect(lambda: self.source.set_speed(self.speed.currentData()))
+        layout.addWidget(self.speed)
+
+        # Milliseconds from the start of the log
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, max(1, round((source.end - source.start) * 1000)))
+        self.slider.sliderMoved.connect(self._slider_moved)
+        layout.addWidget(self.slider, 1)
+
+        self.position = QLabel()
+        layout.addWidget(self.position)
+
+        layout.addWidget(QLabel(Path(source.log.path).name))
+
+        source.position_changed.connect(self._position_changed)
+        source.playing_changed.connect(self._playing_changed)
+        self._position_changed(source.position)
+
+    def toggle(self):
+        if self.source.playing:
+            self.source.pause()
+        else:
+            self.source.play()
+
+    def _slider_moved(self, value: int):
+        self.source.seek(self.source.start + value / 1000)
+
+    def _position_changed(self, position: float):
+        elapsed = position - self.source.start
+        if not self.slider.isSliderDown():
+            self.slider.setValue(round(elapsed * 1000))
+        total = self.source.end - self.source.start
+        self.position.setText(f"{_format_time(elapsed)} / {_format_time(total)}")
+
+    def _playing_changed(self, playing: bool):
+        self.play_button.setIcon(qta.icon("mdi6.pause" if playing else "mdi6.play"))
+        self.play_button.setToolTip("Pause" if playing else "Play")
+
+
+def _format_time(seconds: float) -> str:
+    minutes, seconds = divmod(max(seconds, 0), 60)
+    return f"{int(minutes):02d}:{seconds:06.3f}"
@@ -0,0 +1,99 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class TopicIndex:
+    """
+    Substring and fuzzy search over full topic paths.
+    Keys are added and removed in O(1), the searchable text is only rebuilt on the first search after a change.
+    """
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._lowered: list[str] = []
+        self._positions: dict[str, int] = {}
+
+        self._blob: str | None = None
+        self._starts: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def add(self, key: str):
+        if key in self._positions:
+            return
+        self._positions[key] = len(self._keys)
+        self._keys.append(key)
+        self._lowered.append(key.lower())
+        self._blob = None
+
+    def discard(self, key: str):
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+
+        # Swap the last key into the hole to keep removal O(1)
+        last = self._keys.pop()
+        last_lowered = self._lowered.pop()
+        if position < len(self._keys):
+            self._keys[position] = last
+            self._lowered[position] = last_lowered
+            self._positions[last] = position
+        self._blob = None
+
+    def _build(self):
+        # One string with every key behind a newline lets str.find and the regex engine scan all keys in a single
+        # C-level pass
+        self._blob = "\n" + "\n".join(self._lowered)
+        self._starts = list(accumulate((len(key) + 1 for key in self._lowered), initial=1))
+
+    def _line(self, offset: int) -> int:
+        return bisect_right(self._starts, offset) - 1
+
+    def _line_end(self, line: int) -> int:
+        """Offset of the newline in front of the next key"""
+        return self._starts[line + 1] - 1
+
+    def search(self, query: str, limit: int = 200) -> list[str]:
+        """
+        Up to `limit` keys containing `query`, shortest first, followed by keys containing its characters in order.
+        The scan stops as soon as enough keys are found, so common queries stay cheap on large indexes.
+        """
+        query = query.strip().lower()
+        if not query or not self._keys:
+            return []
+        if self._blob is None:
+            self._build()
+        blob = self._blob
+
+        found: set[int] = set()
+
+        substring = []
+        offset = blob.find(query)
+        while offset != -1 and len(substring) < limit:
+            line = self._line(offset)
+            found.add(line)
+            substring.append(self._keys[line])
+            offset = blob.find(query, self._line_end(line) + 1)
+        substring.sort(key=len)
+
+        # Starting at the newline in front of a key means every key is tried once, and since each gap excludes the
+        # next character the first occurrence of each character is taken without any backtracking
+        gaps = "".join(f"[^\n{re.escape(char)}]*{re.escape(char)}" for char in query if char != "\n")
+        pattern = re.compile("\n" + gaps)
+
+        fuzzy = []
+        match = pattern.search(blob)
+        while match is not None and len(substring) + len(fuzzy) < limit:
+            line = self._line(match.start() + 1)
+            if line not in found:
+                # Keys where the characters appear earliest rank first
+                fuzzy.append((match.end() - match.start(), self._keys[line]))
+            match = pattern.search(blob, self._line_end(line))
+        fuzzy.sort(key=lambda result: (result[0], len(result[1])))
+
+        return substring + [key for _, key in fuzzy]
@@ -0,0 +1,224 @@
+"""
+Local stand-in for a robot's communication server, for benchmarking the dashboard without hardware.
+
+Run with `python -m kevinbotlib_dashboard.simulator` and point the dashboard at `127.0.0.1` and the chosen port.
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+from kevinbotlib.comm import CommunicationServer
+from kevinbotlib.logger import Level, Logger, LoggerConfiguration
+
+
+class ChurnScenario(Enum):
+    Off = "off"
+    """The topic set never changes"""
+    Steady = "steady"
+    """Every period the oldest `churn_count` topics are removed and as many new topics are added"""
+    Burst = "burst"
+    """Every period `churn_count` new topics are added, and removed again one period later"""
+    Flap = "flap"
+    """The same `churn_count` topics are removed and added back every period"""
+
+
+@dataclass
+class SimulatorOptions:
+    topics: int = 100
+    rates: tuple[float, ...] = (10.0,)
+    """Publish rates in Hz, assigned to topics round-robin"""
+    payload_size: int = 0
+    """Length of an extra string element added to every payload"""
+    depth: int = 2
+    """Folders between the root namespace and each topic"""
+    fanout: int = 10
+    """Children per folder"""
+    namespace: str = "sim"
+    churn: ChurnScenario = ChurnScenario.Off
+    churn_count: int = 10
+    churn_period: float = 1.0
+    stats_interval: float = 5.0
+
+
+class Topic:
+    __slots__ = ("index", "interval", "key", "next_due")
+
+    def __init__(self, key: str, index: int, rate: float, now: float):
+        self.key = key
+        self.index = index
+        self.interval = 1 / rate
+        # Spread first publishes over one interval so topics of the same rate don't all fire on the same tick
+        self.next_due = now + self.interval * ((index * 0.618) % 1)
+
+
+class SimulatorServer(CommunicationServer):
+    """A `CommunicationServer` that publishes synthetic topics from its own event loop"""
+
+    def __init__(self, options: SimulatorOptions, host: str = "127.0.0.1", port: int = 8765):
+        super().__init__(host, port)
+        self.options = options
+
+        self.topics: dict[str, Topic] = {}
+        self._counter = itertools.count()
+        self._padding = "x" * options.payload_size
+        self.sent = 0
+
+    def topic_key(self, index: int) -> str:
+        parts = [self.options.namespace]
+        remaining = index
+        for _ in range(self.options.depth):
+            remaining, digit = divmod(remaining, self.options.fanout)
+            parts.append(f"n{digit}")
+        parts.append(f"topic{index}")
+        return "/".join(parts)
+
+    def payload(self, topic: Topic, now: float) -> dict:
+        payload = {
+            "timeout": None,
+            "value": math.sin(now + topic.index),
+            "did": "kevinbotlib.dtype.float",
+            "struct": {"dashboard": [{"element": "value", "format": "raw"}]},
+        }
+        if self._padding:
+            payload["padding"] = self._padding
+            payload["struct"]["dashboard"].append({"element": "padding", "format": "limit:16"})
+        return payload
+
+    def add_topic(self, now: float) -> Topic:
+        index = next(self._counter)
+        rates = self.options.rates
+        topic = Topic(self.topic_key(index), index, rates[index % len(rates)], now)
+        self.topics[topic.key] = topic
+        return topic
+
+    async def publish(self, key: str, payload: dict, now: float):
+        # Same bookkeeping as a client publishing through the server
+        entry = self.data_store.get(key)
+        self.data_store[key] = {"data": payload, "tsu": now, "tsc": entry["tsc"] if entry else now}
+        await self.broadcast({"action": "update", "key": key, "data": self.data_store[key]})
+        self.sent += 1
+
+    async def remove(self, key: str):
+        self.topics.pop(key, None)
+        if self.data_store.pop(key, None) is not None:
+            await self.broadcast({"action": "delete", "key": key})
+
+    async def churn(self, now: float, burst: list[str]):
+        options = self.options
+        match options.churn:
+            case ChurnScenario.Steady:
+                for key in list(itertools.islice(self.topics, options.churn_count)):
+                    await self.remove(key)
+                for _ in range(options.churn_count):
+                    self.add_topic(now)
+            case ChurnScenario.Burst:
+                if burst:
+                    for key in burst:
+                        await self.remove(key)
+                    burst.clear()
+                else:
+                    burst.extend(self.add_topic(now).key for _ in range(options.churn_count))
+            case ChurnScenario.Flap:
+                flapping = [self.topic_key(index) for index in range(min(options.churn_count, options.topics))]
+                if flapping[0] in self.topics:
+                    for key in flapping:
+                        await self.remove(key)
+                else:
+                    for index, key in enumerate(flapping):
+                        rates = options.rates
+                        self.topics[key] = Topic(key, index, rates[index % len(rates)], now)
+
+    async def generate(self):
+        options = self.options
+        now = time.time()
+        for _ in range(options.topics):
+            self.add_topic(now)
+
+        tick = min(0.01, 1 / max(options.rates))
+        next_churn = now + options.churn_period
+        next_stats, last_sent = now + options.stats_interval, 0
+        burst: list[str] = []
+
+        while True:
+            now = time.time()
+            for topic in list(self.topics.values()):
+                if topic.next_due <= now:
+                    # Skip missed publishes instead of bursting to catch up
+                    topic.next_due = max(topic.next_due + topic.interval, now)
+                    await self.publish(topic.key, self.payload(topic, now), now)
+
+            if options.churn != ChurnScenario.Off and now >= next_churn:
+                await self.churn(now, burst)
+                next_churn += options.churn_period
+
+            if now >= next_stats:
+                rate = (self.sent - last_sent) / options.stats_interval
+                self.logger.info(f"{len(self.topics)} topics, {rate:.0f} updates/s to {len(self.clients)} clients")
+                last_sent = self.sent
+                next_stats += options.stats_interval
+
+            await asyncio.sleep(max(0.0, tick - (time.time() - now)))
+
+    async def serve_async(self) -> None:
+        task = asyncio.create_task(self.generate())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        await super().serve_async()
+
+
+def _rates(value: str) -> tuple[float, ...]:
+    rates = tuple(float(rate) for rate in value.split(","))
+    if any(rate <= 0 for rate in rates):
+        msg = "rates must be positive"
+        raise argparse.ArgumentTypeError(msg)
+    return rates
+
+
+def run():
+    defaults = SimulatorOptions()
+    parser = argparse.ArgumentParser(description="Serve synthetic KevinbotLib topics for benchmarking the dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-n", "--topics", type=int, default=defaults.topics, help="Number of topics")
+    parser.add_argument(
+        "--rates", type=_rates, default=defaults.rates, help="Comma separated publish rates in Hz, assigned round-robin"
+    )
+    parser.add_argument(
+        "--payload-size", type=int, default=defaults.payload_size, help="Bytes of extra string data per payload"
+    )
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="Folder depth of each topic")
+    parser.add_argument("--fanout", type=int, default=defaults.fanout, help="Children per folder")
+    parser.add_argument("--namespace", default=defaults.namespace)
+    parser.add_argument("--churn", choices=[scenario.value for scenario in ChurnScenario], default=defaults.churn.value)
+    parser.add_argument("--churn-count", type=int, default=defaults.churn_count, help="Topics changed per churn")
+    parser.add_argument("--churn-period", type=float, default=defaults.churn_period, help="Seconds between churns")
+    parser.add_argument("-V", "--verbose", action="store_true", help="Enable verbose (DEBUG) logging")
+    args = parser.parse_args()
+
+    Logger().configure(LoggerConfiguration(level=Level.DEBUG if args.verbose else Level.INFO))
+
+    options = SimulatorOptions(
+        topics=args.topics,
+        rates=args.rates,
+        payload_size=args.payload_size,
+        depth=args.depth,
+        fanout=max(1, args.fanout),
+        namespace=args.namespace,
+        churn=ChurnScenario(args.churn),
+        churn_count=args.churn_count,
+        churn_period=args.churn_period,
+    )
+    server = SimulatorServer(options, args.host, args.port)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,130 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from PySide6.QtCore import QThread
+
+
+class Tracer:
+    """
+    Collects Chrome trace events, the JSON written by `stop` opens in Perfetto and `chrome://tracing`.
+    Spans are no-ops until `start` is called.
+    """
+
+    def __init__(self, max_events: int = 2_000_000):
+        self.enabled = False
+        self.max_events = max_events
+        self.path: str | None = None
+
+        self._events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._origin = 0.0
+        self._dropped = 0
+
+    def start(self, path: str):
+        self.path = path
+        self._events = []
+        self._threads = {}
+        self._dropped = 0
+        self._origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        """Write the collected events to the file given to `start`"""
+        if not self.enabled:
+            return
+        self.enabled = False
+
+        pid = os.getpid()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.items()
+        ]
+        with open(self.path, "w") as file:  # type: ignore
+            json.dump(
+                {
+                    "traceEvents": metadata + self._events,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"dropped_events": self._dropped},
+                },
+                file,
+            )
+        self._events = []
+
+    def _thread(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            # Qt's worker threads are only named on the QThread
+            self._threads[tid] = QThread.currentThread().objectName() or threading.current_thread().name
+        return tid
+
+    def complete(self, name: str, start: float, end: float, category: str = "dashboard", args: dict | None = None):
+        """Add a span between two `time.perf_counter` readings"""
+        if not self.enabled:
+            return
+        if len(self._events) >= self.max_events:
+            self._dropped += 1
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": self._thread(),
+        }
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def counter(self, name: str, values: dict[str, float], category: str = "dashboard"):
+        if not self.enabled or len(self._events) >= self.max_events:
+            return
+        self._events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "C",
+                "ts": (time.perf_counter() - self._origin) * 1e6,
+                "pid": os.getpid(),
+                "tid": self._thread(),
+                "args": values,
+            }
+        )
+
+    @contextmanager
+    def span(self, name: str, category: str = "dashboard") -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, start, time.perf_counter(), category)
+
+
+tracer = Tracer()
+"""Shared by the whole dashboard, started by `--trace-events`"""
+
+
+def traced(name: str, category: str = "timer"):
+    """Wrap a callback in a span, used for timer callbacks"""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
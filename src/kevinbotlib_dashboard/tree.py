@@ -1,25 +1,37 @@
+from collections.abc import Iterable
 from typing import Any, override
 
 from PySide6.QtCore import QAbstractItemModel, QModelIndex, QPersistentModelIndex, Qt
+from PySide6.QtGui import QFont, QGuiApplication, QPalette
 
 
 class TreeItem:
-    def __init__(self, data: Any, key: str = "", parent: "TreeItem | None" = None):
+    __slots__ = ("child_items", "data", "fetched", "key", "parent_item", "row_number", "userdata")
+
+    def __init__(self, data: Any, key: str = "", parent: "TreeItem | None" = None, row: int = 0):
         self.data = data
         self.key = key
         self.parent_item = parent
+        self.row_number = row
+        self.userdata = None
 
         self.child_items: list[TreeItem] = []
+        self.fetched = True
         if isinstance(data, dict):
-            for k, v in data.items():
-                self.child_items.append(TreeItem(v, k, self))
-        self.userdata = None
+            if "key" in data:
+                self.userdata = data["key"]  # This is the sendable, dont show any more data
+            else:
+                # Folder, its children are only built once the view asks for them
+                self.fetched = False
+
+    def populate(self):
+        self.child_items = [TreeItem(v, k, self, i) for i, (k, v) in enumerate(self.data.items())]
+        self.fetched = True
 
-        if len(self.child_items) > 0:
-            for child in self.child_items:
-                if child.key == "key":
-                    self.userdata = child.data
-                    self.child_items.clear()  # This is the sendable, dont show any more data
+    def has_children(self) -> bool:
+        if self.fetched:
+            return len(self.child_items) > 0
+        return len(self.data) > 0
 
     def child(self, row: int) -> "TreeItem":
         if 0 <= row < len(self.child_items):
@@ -30,18 +42,30 @@ class TreeItem:
         return len(self.child_items)
 
     def row(self) -> int:
-        if self.parent_item:
-            return self.parent_item.child_items.index(self)
-        return 0
+        return self.row_number
 
     def parent(self) -> "TreeItem":
         return self.parent_item
 
 
+def _child_path(parent_path: str | None, key: str) -> str:
+    return key if parent_path is None else f"{parent_path}/{key}"
+
+
 class DictTreeModel(QAbstractItemModel):
     def __init__(self, data: dict):
         super().__init__()
         self.root_item = TreeItem(data)
+        self.root_item.populate()
+
+        self.nodes: dict[str, TreeItem] = {}
+        """Every built item by its full path, for topics this is the topic key"""
+        self._index_children(self.root_item, None)
+
+        self.stale: set[str] = set()
+        """Topics shown as out of date"""
+        self._stale_font = QFont()
+        self._stale_font.setItalic(True)
 
     def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:  # noqa: B008
         if not self.hasIndex(row, column, parent):
@@ -75,6 +99,33 @@ class DictTreeModel(QAbstractItemModel):
 
         return parent_item.child_count()
 
+    @override
+    def hasChildren(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> bool:  # noqa: B008
+        parent_item = self.root_item if not parent.isValid() else parent.internalPointer()
+        return parent_item.has_children()
+
+    @override
+    def canFetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> bool:
+        parent_item = self.root_item if not parent.isValid() else parent.internalPointer()
+        return not parent_item.fetched
+
+    @override
+    def fetchMore(self, parent: QModelIndex | QPersistentModelIndex):
+        parent_item = self.root_item if not parent.isValid() else parent.internalPointer()
+        if parent_item.fetched:
+            return
+
+        # Mark it fetched first, views may ask again while the rows are being inserted
+        parent_item.fetched = True
+        count = len(parent_item.data)
+        if count == 0:
+            return
+
+        self.beginInsertRows(parent, 0, count - 1)
+        parent_item.populate()
+        self._index_children(parent_item, self._path_of(parent_item))
+        self.endInsertRows()
+
     @override
     def columnCount(self, /, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:  # noqa: B008
         return 1
@@ -94,10 +145,248 @@ class DictTreeModel(QAbstractItemModel):
                 return f"{item.key}"
         elif role == Qt.ItemDataRole.UserRole:
             return item.userdata
+        elif item.userdata is not None and item.userdata in self.stale:
+            if role == Qt.ItemDataRole.FontRole:
+                return self._stale_font
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QGuiApplication.palette().brush(QPalette.ColorGroup.Disabled, QPalette.ColorRole.Text)
 
         return None
 
+    def item_for_key(self, key: str) -> TreeItem | None:
+        """Look up the item of a topic or folder by its full path"""
+        return self.nodes.get(key)
+
+    def key_for_index(self, index: QModelIndex) -> str | None:
+        """Full path of the item at `index`"""
+        if not index.isValid():
+            return None
+        return self._path_of(index.internalPointer())
+
+    def index_for_key(self, key: str) -> QModelIndex:
+        item = self.nodes.get(key)
+        if item is None:
+            return QModelIndex()
+        return self._index_of(item)
+
+    def fetch_path(self, key: str) -> QModelIndex:
+        """Build the folders leading to `key` and return its index"""
+        item, path = self.root_item, None
+        for part in key.split("/"):
+            if not item.fetched:
+                self.fetchMore(self._index_of(item))
+            path = _child_path(path, part)
+            item = self.nodes.get(path)
+            if item is None:
+                return QModelIndex()
+        return self._index_of(item)
+
     def update_data(self, new_data: dict):
-        self.beginResetModel()
-        self.root_item = TreeItem(new_data)
-        self.endResetModel()
+        """Merge `new_data` into the live tree, emitting only the row and data changes that differ"""
+        self._sync_children(self.root_item, None, new_data)
+        self.root_item.data = new_data
+
+    def apply_diff(self, updated: dict[str, dict], removed: Iterable[str]):
+        """Apply per-topic changes, `updated` maps full keys to their formatted viewables"""
+        for key in removed:
+            self._remove_topic(key)
+        for key, items in updated.items():
+            self._set_topic(key, items)
+
+    def set_stale(self, stale: set[str]):
+        """Mark the topics in `stale` as out of date, only rows that changed are repainted"""
+        changed = stale ^ self.stale
+        self.stale = stale
+        for key in changed:
+            item = self.nodes.get(key)
+            if item is not None and item.userdata == key:
+                index = self._index_of(item)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.FontRole, Qt.ItemDataRole.ForegroundRole])
+
+    def _index_of(self, item: TreeItem) -> QModelIndex:
+        if item is self.root_item:
+            return QModelIndex()
+        return self.createIndex(item.row_number, 0, item)
+
+    def _index_children(self, item: TreeItem, path: str | None):
+        for child in item.child_items:
+            child_path = _child_path(path, child.key)
+            self.nodes[child_path] = child
+            self._index_children(child, child_path)
+
+    def _unindex_children(self, item: TreeItem, path: str | None):
+        for child in item.child_items:
+            child_path = _child_path(path, child.key)
+            self.nodes.pop(child_path, None)
+            self._unindex_children(child, child_path)
+
+    def _path_of(self, item: TreeItem) -> str | None:
+        parts = []
+        while item is not self.root_item:
+            parts.append(item.key)
+            item = item.parent_item
+        return "/".join(reversed(parts)) if parts else None
+
+    def _set_topic(self, key: str, items: dict):
+        data = {"items": items, "key": key}
+
+        item = self.nodes.get(key)
+        if item is not None:
+            self._sync_item(item, key, data)
+            return
+
+        parts = key.split("/")
+        parent_item, parent_path = self.root_item, None
+        for depth, part in enumerate(parts[:-1]):
+            if not parent_item.fetched:
+                self._set_pending(parent_item, parts[depth:], data)
+                return
+            path = _child_path(parent_path, part)
+            child = self.nodes.get(path)
+            if child is None:
+                child = self._append_children(parent_item, parent_path, [(part, {})])
+            elif child.userdata is not None:
+                return  # A sendable can't hold other topics, same as building the tree from the flat dict
+            parent_item, parent_path = child, path
+
+        if not parent_item.fetched:
+            self._set_pending(parent_item, parts[-1:], data)
+            return
+        self._append_children(parent_item, parent_path, [(parts[-1], data)])
+
+    @staticmethod
+    def _set_pending(item: TreeItem, parts: list[str], data: dict):
+        """Write a topic into the data of a folder that hasn't been fetched yet"""
+        d = item.data
+        for part in parts[:-1]:
+            child = d.get(part)
+            if child is None:
+                child = d[part] = {}
+            elif "key" in child:
+                return  # A sendable can't hold other topics
+            d = child
+        d[parts[-1]] = data
+
+    def _append_children(self, parent_item: TreeItem, parent_path: str | None, children: list[tuple[str, Any]]):
+        """Append `(key, data)` rows in one batch, returns the last new item"""
+        first = parent_item.child_count()
+        self.beginInsertRows(self._index_of(parent_item), first, first + len(children) - 1)
+        for row, (key, value) in enumerate(children, first):
+            child = TreeItem(value, key, parent_item, row)
+            parent_item.child_items.append(child)
+            child_path = _child_path(parent_path, key)
+            self.nodes[child_path] = child
+            self._index_children(child, child_path)
+        self.endInsertRows()
+        return child
+
+    def _remove_children(self, parent_item: TreeItem, parent_path: str | None, first: int, last: int):
+        # Unindex first so views reacting to the removal can tell the items are gone
+        for child in parent_item.child_items[first : last + 1]:
+            child_path = _child_path(parent_path, child.key)
+            self.nodes.pop(child_path, None)
+            self._unindex_children(child, child_path)
+        self.beginRemoveRows(self._index_of(parent_item), first, last)
+        del parent_item.child_items[first : last + 1]
+        for row in range(first, len(parent_item.child_items)):
+            parent_item.child_items[row].row_number = row
+        self.endRemoveRows()
+
+    def _remove_topic(self, key: str):
+        item = self.nodes.get(key)
+        if item is None:
+            self._remove_pending(key)
+            return
+        if item.userdata != key:
+            return
+        self._remove_item(item)
+
+    def _remove_pending(self, key: str):
+        """Remove a topic that sits below a folder that hasn't been fetched yet"""
+        parts = key.split("/")
+        item, path = self.root_item, None
+        for depth, part in enumerate(parts):  # noqa: B007
+            if not item.fetched:
+                break
+            path = _child_path(path, part)
+            item = self.nodes.get(path)
+            if item is None:
+                return
+        else:
+            return
+
+        chain = [item.data]
+        for part in parts[depth:-1]:
+            child = chain[-1].get(part)
+            if not isinstance(child, dict):
+                return
+            chain.append(child)
+        leaf = chain[-1].get(parts[-1])
+        if not isinstance(leaf, dict) or leaf.get("key") != key:
+            return
+
+        del chain[-1][parts[-1]]
+        # Prune folders left empty, chain[i] is stored under parts[depth + i - 1]
+        for i in range(len(chain) - 1, 0, -1):
+            if chain[i]:
+                break
+            del chain[i - 1][parts[depth + i - 1]]
+
+        if not item.data:
+            self._remove_item(item)
+
+    def _remove_item(self, item: TreeItem):
+        # Drop the item along with any folders it leaves empty
+        while item.parent_item is not self.root_item and item.parent_item.child_count() == 1:
+            item = item.parent_item
+        parent_item = item.parent_item
+        self._remove_children(parent_item, self._path_of(parent_item), item.row_number, item.row_number)
+
+    def _sync_children(self, parent_item: TreeItem, parent_path: str | None, new_data: dict):
+        new_keys = new_data.keys()
+
+        # Remove stale rows back to front, collapsing adjacent rows into a single range
+        row = len(parent_item.child_items) - 1
+        while row >= 0:
+            if parent_item.child_items[row].key in new_keys:
+                row -= 1
+                continue
+            last = row
+            while row > 0 and parent_item.child_items[row - 1].key not in new_keys:
+                row -= 1
+            self._remove_children(parent_item, parent_path, row, last)
+            row -= 1
+
+        # Update rows that are still present
+        existing = set()
+        for child in parent_item.child_items:
+            existing.add(child.key)
+            self._sync_item(child, _child_path(parent_path, child.key), new_data[child.key])
+
+        # Append new rows in one batch
+        added = [(k, v) for k, v in new_data.items() if k not in existing]
+        if added:
+            self._append_children(parent_item, parent_path, added)
+
+    def _sync_item(self, item: TreeItem, path: str, value: Any):
+        old_userdata = item.userdata
+        was_dict = isinstance(item.data, dict)
+        item.data = value
+
+        if isinstance(value, dict) and "key" in value:
+            # This is the sendable, dont show any more data
+            item.userdata = value["key"]
+            if item.child_items:
+                self._remove_children(item, path, 0, len(item.child_items) - 1)
+            item.fetched = True
+        elif not item.fetched:
+            # The children were never built, they'll be built from the new data once fetched
+            item.userdata = None
+            item.fetched = not isinstance(value, dict)
+        else:
+            item.userdata = None
+            self._sync_children(item, path, value if isinstance(value, dict) else {})
+
+        if item.userdata != old_userdata or isinstance(value, dict) != was_dict:
+            index = self._index_of(item)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole])
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections.abc import Callable
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class TopicUpdateQueue(QObject):
+    """Thread-safe set of dirty topic keys, marshalled to the GUI thread through a queued signal"""
+
+    updated = Signal()
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._dirty: set[str] = set()
+        self._resync = False
+        self._pending = False
+
+    def mark_dirty(self, key: str):
+        with self._lock:
+            self._dirty.add(key)
+            notify = not self._pending
+            self._pending = True
+        if notify:
+            self.updated.emit()
+
+    def mark_all(self):
+        """Request that every key be reprocessed, used when the whole data store is replaced"""
+        with self._lock:
+            self._resync = True
+            notify = not self._pending
+            self._pending = True
+        if notify:
+            self.updated.emit()
+
+    def take(self) -> tuple[set[str], bool]:
+        """Return the dirty keys and the resync flag, and reset both"""
+        with self._lock:
+            dirty, resync = self._dirty, self._resync
+            self._dirty = set()
+            self._resync = False
+            self._pending = False
+        return dirty, resync
+
+
+class FramePacer(QObject):
+    """
+    Runs `callback` at most once per display frame.
+    Requests right after a quiet period run immediately, bursts are held until the next frame.
+    """
+
+    def __init__(self, callback: Callable[[], None], frame_rate: float = 60, parent: QObject | None = None):
+        super().__init__(parent)
+        self.callback = callback
+        self.frame_interval = 1 / frame_rate
+
+        self._last_frame = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run)
+
+    def schedule(self):
+        if self._timer.isActive():
+            return
+        delay = self._last_frame + self.frame_interval - time.monotonic()
+        self._timer.start(max(0, round(delay * 1000)))
+
+    def _run(self):
+        self._last_frame = time.monotonic()
+        self.callback()
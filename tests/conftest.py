@@ -0,0 +1,20 @@
+import os
+
+import pytest
+from kevinbotlib.logger import Level, Logger, LoggerConfiguration
+from PySide6.QtWidgets import QApplication
+
+# Read when the application is created, so tests run without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _logger():
+    # Error paths log through the shared logger, which raises until it is configured
+    if not Logger.is_configured:
+        Logger().configure(LoggerConfiguration(level=Level.WARNING))
+
+
+@pytest.fixture(scope="session")
+def qapp() -> QApplication:
+    return QApplication.instance() or QApplication([])  # type: ignore
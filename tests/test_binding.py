@@ -0,0 +1,108 @@
+from typing import override
+
+import pytest
+
+from kevinbotlib_dashboard.app import GridGraphicsView, WidgetGridController, WidgetItem
+from kevinbotlib_dashboard.binding import WidgetBindings
+
+
+class FakeWidget:
+    def __init__(self, *keys: str, follows_samples: bool = False):
+        self.keys = keys
+        self.follows_samples = follows_samples
+        self.changes: list[set[str]] = []
+
+    def bound_keys(self):
+        return self.keys
+
+    def data_changed(self, keys: set[str]):
+        self.changes.append(keys)
+
+    def set_culled(self, culled: bool):
+        pass
+
+
+@pytest.fixture
+def bindings(qapp) -> WidgetBindings:
+    return WidgetBindings()
+
+
+def test_samples_only_reach_followers(bindings: WidgetBindings):
+    label = FakeWidget("a")
+    plot = FakeWidget("a", follows_samples=True)
+    bindings.bind(label)
+    bindings.bind(plot)
+
+    bindings.mark_sampled("a")
+    bindings.flush()
+    assert label.changes == []
+    assert plot.changes == [{"a"}]
+
+    bindings.mark_changed("a")
+    bindings.mark_sampled("a")
+    bindings.flush()
+    assert label.changes == [{"a"}]
+    # A change and a sample in the same frame are delivered once
+    assert plot.changes == [{"a"}, {"a"}]
+
+
+def test_resampling_skips_value_widgets(bindings: WidgetBindings):
+    label = FakeWidget("a")
+    plot = FakeWidget("a", "b", follows_samples=True)
+    bindings.bind(label)
+    bindings.bind(plot)
+
+    bindings.mark_all_sampled()
+    bindings.flush()
+    assert label.changes == []
+    assert plot.changes == [{"a", "b"}]
+
+
+def test_unbound_follower_gets_no_samples(bindings: WidgetBindings):
+    plot = FakeWidget("a", follows_samples=True)
+    bindings.bind(plot)
+    bindings.unbind(plot)
+
+    bindings.mark_sampled("a")
+    bindings.flush()
+    assert plot.changes == []
+
+
+class RecordingItem(WidgetItem):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changes: list[set[str]] = []
+
+    @override
+    def data_changed(self, keys: set[str]):
+        super().data_changed(keys)
+        self.changes.append(keys)
+
+
+def test_widget_bound_to_its_topic(qapp):
+    view = GridGraphicsView(rows=6, cols=6)
+    controller = WidgetGridController(view)
+    bindings = view.bindings
+    item = RecordingItem("speed", view, data={"topic": "robot/speed"})
+    controller.add(item)
+
+    assert bindings.keys(item) == {"robot/speed"}
+
+    bindings.mark_changed("robot/speed")
+    bindings.mark_changed("robot/other")
+    bindings.flush()
+    assert item.changes == [{"robot/speed"}]
+
+    # Changes while culled are held until the widget is visible again
+    bindings.set_culled({item})
+    assert item.culled
+    bindings.mark_changed("robot/speed")
+    bindings.flush()
+    assert item.changes == [{"robot/speed"}]
+    bindings.set_culled(set())
+    assert item.changes == [{"robot/speed"}, {"robot/speed"}]
+
+    controller.remove_widget(item)
+    bindings.mark_changed("robot/speed")
+    bindings.flush()
+    assert len(item.changes) == 2
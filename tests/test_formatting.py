@@ -0,0 +1,65 @@
+import pytest
+
+from kevinbotlib_dashboard.formatting import FormatterCache, compile_viewable, register_format
+
+
+def payload(value, fmt: str | None = "raw") -> dict:
+    viewable = {"element": "value"} if fmt is None else {"element": "value", "format": fmt}
+    return {"value": value, "struct": {"dashboard": [viewable]}}
+
+
+@pytest.mark.parametrize(
+    ("fmt", "raw", "shown"),
+    [
+        ("raw", 1.5, 1.5),
+        ("percent", 0.125, "12.50%"),
+        ("degrees", 90, "90°"),
+        ("radians", 3.14, "3.14 rad"),
+        ("limit:3", "abcdef", "abc"),
+        (None, 1.5, ""),
+    ],
+)
+def test_builtin_formats(fmt: str | None, raw, shown):
+    assert compile_viewable(fmt)(raw) == shown
+
+
+@pytest.mark.parametrize("fmt", ["limit", "limit:", "limit:x", "unknown", "unknown:arg"])
+def test_missing_or_bad_argument_shows_raw(fmt: str):
+    assert compile_viewable(fmt)("abcdef") == "abcdef"
+
+
+def test_format_payload():
+    cache = FormatterCache()
+
+    assert cache.format("a", payload(0.5, "percent")) == {"value": "50.00%"}
+    assert cache.format("a", {"value": 1}) is None
+    assert cache.format("a", {"value": 1, "struct": {}}) is None
+
+
+def test_missing_element_raises():
+    # The pipeline catches this and skips the topic
+    with pytest.raises(KeyError):
+        FormatterCache().format("a", {"struct": {"dashboard": [{"element": "value"}]}})
+
+
+def test_compiled_structs_are_shared_and_recompiled_on_change():
+    cache = FormatterCache()
+    first = payload(1, "degrees")["struct"]
+
+    compiled = cache.get("a", first)
+    assert cache.get("a", first) is compiled
+    # Same sendable type on another topic
+    assert cache.get("b", payload(2, "degrees")["struct"]) is compiled
+
+    changed = cache.get("a", payload(1, "radians")["struct"])
+    assert changed is not compiled
+    assert changed[0][1](1) == "1 rad"
+
+
+def test_registered_format_replaces_cached_formatters():
+    cache = FormatterCache()
+    assert cache.format("a", payload(2, "test_double")) == {"value": 2}
+
+    register_format("test_double", lambda _arg: lambda raw: raw * 2)
+
+    assert cache.format("a", payload(2, "test_double")) == {"value": 4}
@@ -0,0 +1,114 @@
+import numpy as np
+
+from kevinbotlib_dashboard.history import SAMPLE_BYTES, RingBuffer, TopicHistory
+
+
+def payload(**values) -> dict:
+    return {**values, "struct": {"dashboard": [{"element": element} for element in values]}}
+
+
+def test_ring_buffer_wraps():
+    buffer = RingBuffer(4)
+    assert buffer.latest() is None
+    assert buffer.nbytes == 4 * SAMPLE_BYTES
+
+    for i in range(3):
+        buffer.append(i, i * 10)
+    times, values = buffer.ordered()
+    assert times.tolist() == [0, 1, 2]
+    assert values.tolist() == [0, 10, 20]
+
+    for i in range(3, 7):
+        buffer.append(i, i * 10)
+    times, values = buffer.ordered()
+    assert times.tolist() == [3, 4, 5, 6]
+    assert values.tolist() == [30, 40, 50, 60]
+    assert buffer.latest() == (6, 60)
+
+    times, values = buffer.window(4, 5)
+    assert times.tolist() == [4, 5]
+    assert values.tolist() == [40, 50]
+
+
+def test_record_numeric_elements():
+    history = TopicHistory(capacity=8)
+    history.record("arm", payload(angle=1.5, name="arm", enabled=True), timestamp=1)
+    history.record("arm", payload(angle=2.5, name="arm", enabled=False), timestamp=2)
+    # Payloads without a dashboard structure have no history
+    history.record("raw", {"value": 1}, timestamp=1)
+
+    assert "arm" in history
+    assert "raw" not in history
+    assert sorted(history.elements("arm")) == ["angle", "enabled"]
+    assert history.latest("arm", "angle") == (2, 2.5)
+    assert history.latest("arm", "name") is None
+
+    times, values = history.window("arm", "enabled", seconds=5, end=2)
+    assert times.tolist() == [1, 2]
+    assert values.tolist() == [1, 0]
+
+    times, values = history.window("arm", "angle", seconds=0.5, end=2)
+    assert times.tolist() == [2]
+    assert set(history.windows("arm", seconds=5, end=2)) == {"angle", "enabled"}
+
+
+def test_window_uses_clock():
+    now = [10.0]
+    history = TopicHistory(clock=lambda: now[0])
+    history.record("a", payload(value=1))
+    now[0] = 11.0
+    history.record("a", payload(value=2))
+
+    times, values = history.window("a", "value", seconds=0.5)
+    assert times.tolist() == [11.0]
+    assert np.array_equal(values, [2])
+
+
+def test_discard_and_clear():
+    history = TopicHistory(capacity=8)
+    history.record("a", payload(value=1), timestamp=1)
+    history.record("b", payload(value=1), timestamp=1)
+
+    history.discard("a")
+    assert "a" not in history
+    assert history.nbytes == 8 * SAMPLE_BYTES
+    history.discard("missing")
+
+    history.clear()
+    assert "b" not in history
+    assert history.nbytes == 0
+
+
+def test_budget_evicts_unviewed_topics_first():
+    topic_bytes = 8 * SAMPLE_BYTES
+    history = TopicHistory(budget=3 * topic_bytes, capacity=8)
+    for key in ("a", "b", "c"):
+        history.record(key, payload(value=1), timestamp=1)
+    history.mark_viewed("a")
+
+    history.record("d", payload(value=1), timestamp=1)
+    assert "b" not in history
+    assert all(key in history for key in ("a", "c", "d"))
+    assert history.nbytes == 3 * topic_bytes
+
+    # Once everything was viewed the least recently viewed topic goes first
+    history.mark_viewed("c")
+    history.mark_viewed("d")
+    history.mark_viewed("a")
+    history.record("e", payload(value=1), timestamp=1)
+    assert "c" not in history
+    history.mark_viewed("e")
+    history.record("f", payload(value=1), timestamp=1)
+    assert "d" not in history
+    assert all(key in history for key in ("a", "e", "f"))
+
+    history.set_budget(topic_bytes)
+    assert history.nbytes <= topic_bytes
+
+
+def test_topic_larger_than_budget_is_not_recorded():
+    history = TopicHistory(budget=SAMPLE_BYTES, capacity=8)
+    history.record("a", payload(value=1), timestamp=1)
+
+    assert "a" not in history
+    assert history.nbytes == 0
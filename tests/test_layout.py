@@ -0,0 +1,99 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from kevinbotlib_dashboard.layout import (
+    LAYOUT_VERSION,
+    LayoutError,
+    LayoutStore,
+    migrate_layout,
+    read_layout,
+    write_layout,
+)
+
+WIDGET = {"pos": [1, 2], "span_x": 2, "span_y": 2, "info": {}, "kind": "base", "title": "Widget"}
+
+
+def test_migrate_v1_list():
+    widgets = migrate_layout([{**WIDGET, "pos": [1.0, 2.0]}])
+
+    assert widgets == [WIDGET]
+    assert all(isinstance(value, int) for value in widgets[0]["pos"])
+
+
+def test_migrate_current_version_unchanged():
+    assert migrate_layout({"version": LAYOUT_VERSION, "widgets": [WIDGET]}) == [WIDGET]
+
+
+@pytest.mark.parametrize("version", [None, 0, "2", LAYOUT_VERSION + 1])
+def test_migrate_rejects_unknown_versions(version):
+    with pytest.raises(LayoutError):
+        migrate_layout({"version": version, "widgets": []})
+
+
+def test_round_trip(tmp_path: Path):
+    path = tmp_path / "config" / "layout.json"
+    write_layout(path, [WIDGET])
+
+    assert read_layout(path) == [WIDGET]
+    assert json.loads(path.read_text())["version"] == LAYOUT_VERSION
+    assert os.listdir(path.parent) == ["layout.json"]
+
+
+def test_read_missing(tmp_path: Path):
+    assert read_layout(tmp_path / "layout.json") is None
+
+
+@pytest.mark.parametrize("text", ["{bad", "[1]", '{"version": 2}'])
+def test_read_invalid(tmp_path: Path, text: str):
+    path = tmp_path / "layout.json"
+    path.write_text(text)
+
+    with pytest.raises(LayoutError):
+        read_layout(path)
+
+
+def test_failed_write_keeps_old_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "layout.json"
+    write_layout(path, [WIDGET])
+
+    def fail(*_args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError, match="disk full"):
+        write_layout(path, [])
+
+    assert read_layout(path) == [WIDGET]
+    assert os.listdir(tmp_path) == ["layout.json"]
+
+
+@pytest.mark.usefixtures("qapp")
+def test_store_moves_unreadable_file(tmp_path: Path):
+    path = tmp_path / "layout.json"
+    path.write_text("{bad")
+    store = LayoutStore(path, list)
+    failures = []
+    store.failed.connect(failures.append)
+
+    assert store.load() is None
+    assert not path.exists()
+    assert (tmp_path / "layout.json.unreadable").read_text() == "{bad"
+    assert len(failures) == 1
+    store.stop()
+
+
+@pytest.mark.usefixtures("qapp")
+def test_store_writes_latest_snapshot_on_stop(tmp_path: Path):
+    path = tmp_path / "layout.json"
+    widgets = [WIDGET]
+    store = LayoutStore(path, lambda: list(widgets), debounce=60_000)
+
+    store.save()
+    widgets = [WIDGET, {**WIDGET, "title": "Second"}]
+    store.schedule()
+    store.stop()
+
+    assert read_layout(path) == widgets
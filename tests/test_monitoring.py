@@ -0,0 +1,74 @@
+import pytest
+
+from kevinbotlib_dashboard.monitoring import LatencyMonitor, TopicAges
+
+
+def test_latency_stats():
+    monitor = LatencyMonitor(window=4)
+    assert monitor.stats() is None
+
+    monitor.add(5.0, timestamp=0)
+    stats = monitor.stats()
+    assert stats is not None
+    assert stats.last == stats.min == stats.max == 5.0
+    assert stats.jitter == 0.0
+
+    # The window only keeps the last 4 samples
+    for i, latency in enumerate([100.0, 1.0, 3.0, 2.0, 6.0]):
+        monitor.add(latency, timestamp=i + 1)
+    stats = monitor.stats()
+    assert stats is not None
+    assert monitor.values().tolist() == [1.0, 3.0, 2.0, 6.0]
+    assert stats.last == 6.0
+    assert stats.min == 1.0
+    assert stats.max == 6.0
+    assert stats.avg == 3.0
+    assert stats.jitter == pytest.approx((2 + 1 + 4) / 3)
+    assert 3.0 < stats.p95 <= 6.0
+
+
+def test_ages():
+    ages = TopicAges(clock=lambda: 10.0)
+    ages.touch("a", 4.0)
+    ages.touch("b")
+
+    assert len(ages) == 2
+    assert ages.age("a") == 6.0
+    assert ages.age("b") == 0.0
+    assert ages.age("a", now=5.0) == 1.0
+    assert ages.age("missing") is None
+
+    assert ages.stale(5.0) == {"a"}
+    assert ages.stale(5.0, now=20.0) == {"a", "b"}
+    assert ages.stale(20.0) == set()
+
+
+def test_discarded_slots_are_reused():
+    ages = TopicAges(clock=lambda: 10.0, capacity=2)
+    ages.touch("a", 0.0)
+    ages.touch("b", 0.0)
+    ages.discard("a")
+    ages.discard("missing")
+
+    assert ages.age("a") is None
+    assert ages.stale(1.0) == {"b"}
+
+    ages.touch("c", 0.0)
+    assert ages.stale(1.0) == {"b", "c"}
+    assert len(ages._times) == 2
+
+
+def test_ages_grow_past_capacity():
+    ages = TopicAges(clock=lambda: 100.0, capacity=2)
+    for i in range(5):
+        ages.touch(f"t{i}", float(i))
+
+    assert len(ages) == 5
+    assert ages.stale(97.5) == {"t0", "t1", "t2"}
+    assert ages.age("t4") == 96.0
+
+    ages.clear()
+    assert len(ages) == 0
+    assert ages.stale(0.0) == set()
+    ages.touch("t0", 100.0)
+    assert ages.age("t0") == 0.0
@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+import pytest
+
+from kevinbotlib_dashboard.occupancy import OccupancyGrid
+
+
+def brute_force_free(grid: OccupancyGrid, span_x: int, span_y: int) -> tuple[int, int] | None:
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            if grid.is_free(col, row, span_x, span_y):
+                return col, row
+    return None
+
+
+def test_place_and_remove():
+    grid = OccupancyGrid(4, 5)
+    grid.place("a", 1, 1, 2, 2)
+
+    assert grid.rect("a") == (1, 1, 2, 2)
+    assert "a" in grid
+    assert len(grid) == 1
+    assert grid.items_in(0, 0, 2, 2) == ["a"]
+    assert grid.items_in(3, 0, 2, 4) == []
+
+    grid.remove("a")
+    assert grid.rect("a") is None
+    assert not grid.cells.any()
+
+
+def test_place_again_moves_item():
+    grid = OccupancyGrid(4, 4)
+    grid.place("a", 0, 0, 2, 2)
+    grid.place("a", 2, 2, 2, 2)
+
+    assert grid.is_free(0, 0, 2, 2)
+    assert not grid.is_free(2, 2, 1, 1)
+    assert grid.rect("a") == (2, 2, 2, 2)
+
+
+def test_is_free():
+    grid = OccupancyGrid(4, 4)
+    grid.place("a", 0, 0, 2, 2)
+
+    assert not grid.is_free(1, 1, 2, 2)
+    assert grid.is_free(1, 1, 2, 2, ignore="a")
+    assert grid.is_free(2, 0, 2, 4)
+    # Outside the grid
+    assert not grid.is_free(3, 3, 2, 1)
+    assert not grid.is_free(-1, 0, 1, 1)
+
+
+def test_find_free_full_grid():
+    grid = OccupancyGrid(2, 2)
+    grid.place("a", 0, 0, 2, 2)
+
+    assert grid.find_free(1, 1) is None
+    assert grid.find_free(3, 1) is None
+    assert grid.find_free(0, 1) is None
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_free_matches_brute_force(seed: int):
+    rng = random.Random(seed)
+    grid = OccupancyGrid(rng.randrange(1, 12), rng.randrange(1, 12))
+    for i in range(rng.randrange(15)):
+        span_x, span_y = rng.randrange(1, 4), rng.randrange(1, 4)
+        position = grid.find_free(span_x, span_y)
+        if position is not None and rng.random() < 0.8:
+            grid.place(i, *position, span_x, span_y)
+        else:
+            col, row = rng.randrange(grid.cols), rng.randrange(grid.rows)
+            if grid.is_free(col, row, span_x, span_y):
+                grid.place(i, col, row, span_x, span_y)
+
+    for span_x in range(1, 5):
+        for span_y in range(1, 5):
+            assert grid.find_free(span_x, span_y) == brute_force_free(grid, span_x, span_y)
+
+
+def test_can_move():
+    grid = OccupancyGrid(4, 6)
+    grid.place("a", 0, 0, 2, 2)
+    grid.place("b", 2, 0, 2, 2)
+    grid.place("c", 4, 0, 2, 2)
+
+    # Shifting a and b right by two only lands b on c
+    assert not grid.can_move({"a": (2, 0, 2, 2), "b": (4, 0, 2, 2)})
+    assert grid.can_move({"a": (2, 0, 2, 2), "b": (4, 2, 2, 2)})
+    # Moved widgets can't overlap each other
+    assert not grid.can_move({"a": (0, 2, 2, 2), "b": (1, 2, 2, 2)})
+    assert not grid.can_move({"a": (5, 2, 2, 2)})
+
+
+def test_resize_keeps_cells():
+    grid = OccupancyGrid(4, 4)
+    grid.place("a", 1, 1, 2, 2)
+
+    assert grid.fits(3, 3)
+    assert not grid.fits(2, 4)
+
+    grid.resize(6, 3)
+    assert (grid.rows, grid.cols) == (6, 3)
+    assert np.count_nonzero(grid.cells) == 4
+    assert grid.items_in(0, 0, 3, 6) == ["a"]
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from kevinbotlib_dashboard.plot import decimate
+
+
+def brute_force(times: np.ndarray, values: np.ndarray, start: float, end: float, width: int):
+    columns: dict[int, list[float]] = {}
+    for time, value in zip(times.tolist(), values.tolist(), strict=True):
+        column = min(max(int((time - start) * width / (end - start)), 0), width - 1)
+        columns.setdefault(column, []).append(value)
+    ordered = sorted(columns)
+    return ordered, [np.nanmin(columns[c]) for c in ordered], [np.nanmax(columns[c]) for c in ordered]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_brute_force(seed: int):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(0, 10, rng.integers(1, 2000)))
+    values = rng.normal(size=len(times))
+    width = int(rng.integers(1, 300))
+
+    columns, lows, highs = decimate(times, values, 2.0, 8.0, width)
+    expected_columns, expected_lows, expected_highs = brute_force(times, values, 2.0, 8.0, width)
+
+    assert columns.tolist() == expected_columns
+    np.testing.assert_array_equal(lows, expected_lows)
+    np.testing.assert_array_equal(highs, expected_highs)
+
+
+def test_samples_outside_window_are_clamped():
+    columns, lows, highs = decimate(np.array([-5.0, 0.5, 20.0]), np.array([1.0, 2.0, 3.0]), 0.0, 1.0, 2)
+
+    assert columns.tolist() == [0, 1]
+    assert lows.tolist() == [1.0, 2.0]
+    assert highs.tolist() == [1.0, 3.0]
+
+
+def test_nan_only_columns_stay_nan():
+    columns, lows, highs = decimate(np.array([0.1, 0.2, 0.6]), np.array([np.nan, 1.0, np.nan]), 0.0, 1.0, 2)
+
+    assert columns.tolist() == [0, 1]
+    assert lows[0] == highs[0] == 1.0
+    assert np.isnan(lows[1])
+    assert np.isnan(highs[1])
+
+
+@pytest.mark.parametrize(("start", "end", "width"), [(0.0, 1.0, 0), (1.0, 1.0, 10), (2.0, 1.0, 10)])
+def test_empty_window(start: float, end: float, width: int):
+    columns, lows, highs = decimate(np.array([0.5]), np.array([1.0]), start, end, width)
+
+    assert len(columns) == len(lows) == len(highs) == 0
+
+
+def test_no_samples():
+    columns, _, _ = decimate(np.empty(0), np.empty(0), 0.0, 1.0, 10)
+
+    assert len(columns) == 0
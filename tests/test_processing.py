@@ -0,0 +1,103 @@
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from kevinbotlib_dashboard.processing import TopicDiff, TopicPipeline, TopicProcessor, TopicSnapshot
+
+
+def payload(value) -> dict:
+    return {"value": value, "struct": {"dashboard": [{"element": "value", "format": "raw"}]}}
+
+
+def process(processor: TopicProcessor, snapshot: TopicSnapshot) -> TopicDiff:
+    diffs = []
+    processor.processed.connect(diffs.append)
+    try:
+        processor.process(snapshot)
+    finally:
+        processor.processed.disconnect(diffs.append)
+    return diffs[0]
+
+
+def test_merge_partial_keeps_latest_value():
+    snapshot = TopicSnapshot({"a": payload(1), "b": payload(2)})
+    snapshot.merge(TopicSnapshot({"a": payload(3), "c": None}))
+
+    assert snapshot.values == {"a": payload(3), "b": payload(2), "c": None}
+    assert not snapshot.full
+
+
+def test_merge_full_replaces_everything():
+    snapshot = TopicSnapshot({"a": payload(1), "b": payload(2)})
+    snapshot.merge(TopicSnapshot({"b": payload(3)}, full=True))
+    # A partial update after a full snapshot stays full
+    snapshot.merge(TopicSnapshot({"c": payload(4)}))
+
+    assert snapshot.values == {"b": payload(3), "c": payload(4)}
+    assert snapshot.full
+
+
+def test_unchanged_payload_is_skipped():
+    processor = TopicProcessor()
+
+    diff = process(processor, TopicSnapshot({"a": payload(1), "b": payload(2)}))
+    assert set(diff.updated) == {"a", "b"}
+
+    diff = process(processor, TopicSnapshot({"a": payload(1), "b": payload(5)}))
+    assert diff.updated == {"b": {"value": 5}}
+    assert not diff.removed
+
+    assert not process(processor, TopicSnapshot({"a": payload(1)}))
+
+
+def test_deleted_and_missing_keys_are_removed():
+    processor = TopicProcessor()
+    process(processor, TopicSnapshot({"a": payload(1), "b": payload(2), "c": payload(3)}))
+
+    diff = process(processor, TopicSnapshot({"a": None}))
+    assert diff.removed == ["a"]
+    assert diff.tree is None
+
+    diff = process(processor, TopicSnapshot({"b": payload(2)}, full=True))
+    assert diff.removed == ["c"]
+    assert not diff.updated
+    assert diff.tree == {"b": {"key": "b", "items": {"value": 2}}}
+
+    # A deleted key that comes back is reported again
+    diff = process(processor, TopicSnapshot({"a": payload(1)}))
+    assert diff.updated == {"a": {"value": 1}}
+
+
+def test_malformed_payload_only_hides_its_topic():
+    processor = TopicProcessor()
+    process(processor, TopicSnapshot({"a": payload(1)}))
+
+    bad = {"value": 1, "struct": {"dashboard": [{"element": "missing", "format": "raw"}]}}
+    diff = process(processor, TopicSnapshot({"a": bad, "b": payload(2)}))
+
+    assert diff.removed == ["a"]
+    assert diff.updated == {"b": {"value": 2}}
+
+
+@pytest.mark.usefixtures("qapp")
+def test_pipeline_coalesces_while_busy():
+    pipeline = TopicPipeline()
+    diffs: list[TopicDiff] = []
+    pipeline.diff_ready.connect(diffs.append)
+    try:
+        pipeline.submit(TopicSnapshot({"a": payload(1)}))
+        # Both are merged into one pending snapshot, only the latest value of `b` is processed
+        pipeline.submit(TopicSnapshot({"b": payload(2)}))
+        pipeline.submit(TopicSnapshot({"b": payload(3)}))
+        assert pipeline.pending is not None
+
+        end = time.monotonic() + 5
+        while (len(diffs) < 2 or pipeline.busy) and time.monotonic() < end:
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+    finally:
+        pipeline.stop()
+
+    assert [diff.updated for diff in diffs] == [{"a": {"value": 1}}, {"b": {"value": 3}}]
+    assert pipeline.pending is None
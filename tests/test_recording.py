@@ -0,0 +1,104 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from kevinbotlib_dashboard.recording import RecordKind, TelemetryLog, TelemetryRecorder
+
+Event = tuple[float, str, dict | None]
+
+
+def make_events(seed: int = 0, count: int = 400) -> list[Event]:
+    """Updates and deletes of a few keys over 20 seconds, `None` payloads are deletes"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        key = f"robot/topic{rng.randrange(8)}"
+        payload = None if rng.random() < 0.1 else {"value": i, "struct": {"dashboard": [{"element": "value"}]}}
+        events.append((i * 0.05, key, payload))
+    return events
+
+
+def record(path: Path, events: list[Event]):
+    recorder = TelemetryRecorder(str(path), keyframe_interval=2.0)
+    for timestamp, key, payload in events:
+        if payload is None:
+            recorder.record_delete(key, timestamp)
+        else:
+            recorder.record_update(key, payload, timestamp)
+    recorder.stop()
+
+
+def expected_state(events: list[Event], timestamp: float) -> dict[str, tuple[float, dict]]:
+    state = {}
+    for event_time, key, payload in events:
+        if event_time > timestamp:
+            break
+        if payload is None:
+            state.pop(key, None)
+        else:
+            state[key] = (event_time, payload)
+    return state
+
+
+def test_round_trip(tmp_path: Path):
+    path = tmp_path / "test.kblog"
+    events = make_events()
+    record(path, events)
+
+    log = TelemetryLog(str(path))
+    assert log.start == events[0][0]
+    assert log.end == events[-1][0]
+    assert len(log.index.keyframes) == 9
+
+    replayed = []
+    state: dict[str, tuple[float, dict]] = {}
+    for entry in log.records(log.first_record()):
+        key = log.apply(entry, state)
+        if key is not None:
+            replayed.append((entry.timestamp, key, state[key][1] if entry.kind == RecordKind.UPDATE else None))
+    assert replayed == events
+    log.close()
+
+
+@pytest.mark.parametrize("timestamp", [-1.0, 0.0, 1.99, 2.0, 7.33, 13.0, 19.95, 100.0])
+def test_state_at_matches_replay(tmp_path: Path, timestamp: float):
+    path = tmp_path / "test.kblog"
+    events = make_events()
+    record(path, events)
+
+    log = TelemetryLog(str(path))
+    state, offset = log.state_at(timestamp)
+
+    assert state == expected_state(events, timestamp)
+    following = next(log.records(offset), None)
+    assert following is None or following.timestamp > timestamp
+    log.close()
+
+
+def test_unclosed_log_is_scanned(tmp_path: Path):
+    path = tmp_path / "test.kblog"
+    events = make_events()
+    record(path, events)
+    closed = TelemetryLog(str(path))
+    data_end, keyframes = closed.index.data_end, closed.index.keyframes
+    closed.close()
+
+    # A crash leaves no index and the last record cut off
+    with path.open("r+b") as file:
+        file.truncate(data_end - 3)
+
+    log = TelemetryLog(str(path))
+    assert log.index.keyframes == keyframes
+    assert log.end == events[-1][0]
+    assert log.state_at(log.end)[0] == expected_state(events[:-1], log.end)
+    assert len(list(log.records(log.first_record()))) > 0
+    log.close()
+
+
+def test_rejects_other_files(tmp_path: Path):
+    path = tmp_path / "other.json"
+    path.write_text("{}")
+
+    with pytest.raises(ValueError, match="not a telemetry log"):
+        TelemetryLog(str(path))
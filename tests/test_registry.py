@@ -0,0 +1,64 @@
+import sys
+
+import pytest
+
+from kevinbotlib_dashboard import registry
+from kevinbotlib_dashboard.app import WidgetItem
+from kevinbotlib_dashboard.plot_widget import PlotWidgetItem
+from kevinbotlib_dashboard.registry import kinds, load_kind, register_kind
+
+
+@pytest.fixture(autouse=True)
+def _restore_registry(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(registry, "_kinds", dict(registry._kinds))
+    monkeypatch.setattr(registry, "_failed", set(registry._failed))
+
+
+def test_builtin_kinds():
+    assert {"base", "plot"} <= set(kinds())
+    assert load_kind("base") is WidgetItem
+    assert load_kind("plot") is PlotWidgetItem
+
+
+def test_kind_is_imported_on_first_use(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "lazy_gauge.py").write_text(
+        "from kevinbotlib_dashboard.app import WidgetItem\n\nclass GaugeWidgetItem(WidgetItem):\n    pass\n"
+    )
+    monkeypatch.syspath_prepend(tmp_path)
+    monkeypatch.delitem(sys.modules, "lazy_gauge", raising=False)
+
+    register_kind("gauge", "lazy_gauge:GaugeWidgetItem")
+    assert "gauge" in kinds()
+    assert "lazy_gauge" not in sys.modules
+
+    gauge = load_kind("gauge")
+    assert gauge is sys.modules["lazy_gauge"].GaugeWidgetItem
+    assert load_kind("gauge") is gauge
+
+
+def test_unknown_kind():
+    assert load_kind("missing") is None
+
+
+def test_failed_import_is_remembered():
+    register_kind("broken", "kevinbotlib_dashboard_missing_module:Widget")
+
+    assert load_kind("broken") is None
+    assert "broken" in registry._failed
+
+    # Registering the kind again retries the import
+    register_kind("broken", WidgetItem)
+    assert load_kind("broken") is WidgetItem
+
+
+def test_topic_info():
+    raw = {
+        "name": "arm",
+        "angle": 1.5,
+        "struct": {"dashboard": [{"element": "name", "format": "raw"}, {"element": "angle", "format": "raw"}]},
+    }
+
+    assert WidgetItem.topic_info("arm", raw) == {"topic": "arm"}
+    assert PlotWidgetItem.topic_info("arm", raw) == {"topic": "arm", "element": "angle"}
+    assert PlotWidgetItem.topic_info("arm", {"name": "arm", "struct": {"dashboard": [{"element": "name"}]}}) is None
+    assert PlotWidgetItem.topic_info("arm", {}) is None
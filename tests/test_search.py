@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from kevinbotlib_dashboard.search import TopicIndex
+
+
+def is_subsequence(query: str, key: str) -> bool:
+    chars = iter(key)
+    return all(char in chars for char in query)
+
+
+def make_index(keys: list[str]) -> TopicIndex:
+    index = TopicIndex()
+    for key in keys:
+        index.add(key)
+    return index
+
+
+def test_substring_before_fuzzy():
+    index = make_index(["robot/drive/left", "robot/arm", "robot/drive", "sensors/distance"])
+
+    assert index.search("drive") == ["robot/drive", "robot/drive/left"]
+    # robot/drive/left has no "s", only sensors/distance has all three in order
+    assert index.search("dst") == ["sensors/distance"]
+    assert index.search("rarm") == ["robot/arm"]
+
+
+def test_case_insensitive():
+    index = make_index(["Robot/Battery"])
+
+    assert index.search("battery") == ["Robot/Battery"]
+    assert index.search("ROBOT") == ["Robot/Battery"]
+
+
+def test_empty_query_and_index():
+    assert TopicIndex().search("a") == []
+    assert make_index(["a"]).search("  ") == []
+
+
+def test_discard_and_readd():
+    index = make_index(["a/x", "b/x", "c/x"])
+    index.discard("a/x")
+    index.discard("missing")
+
+    assert len(index) == 2
+    assert "a/x" not in index
+    assert sorted(index.search("x")) == ["b/x", "c/x"]
+
+    index.add("a/x")
+    index.add("a/x")
+    assert sorted(index.search("x")) == ["a/x", "b/x", "c/x"]
+
+
+def test_limit():
+    index = make_index([f"topic/{i}" for i in range(50)])
+
+    assert len(index.search("topic", limit=10)) == 10
+    assert len(index.search("tpc", limit=10)) == 10
+
+
+def test_special_characters():
+    index = make_index(["a.b/[c]", "axb/c"])
+
+    assert index.search("a.b") == ["a.b/[c]"]
+    assert index.search("[c]") == ["a.b/[c]"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force(seed: int):
+    rng = random.Random(seed)
+    alphabet = "abc/"
+    keys = {"".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 10))) for _ in range(100)}
+    index = make_index(sorted(keys))
+    for key in rng.sample(sorted(keys), 20):
+        index.discard(key)
+        keys.discard(key)
+
+    for _ in range(20):
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 4)))
+        results = index.search(query, limit=len(keys))
+
+        substring = [key for key in keys if query in key]
+        assert len(results) == len(set(results))
+        assert set(results[: len(substring)]) == set(substring)
+        assert [len(key) for key in results[: len(substring)]] == sorted(len(key) for key in substring)
+        assert set(results) == {key for key in keys if is_subsequence(query, key)}
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+from PySide6.QtCore import QModelIndex, Qt
+
+from kevinbotlib_dashboard.processing import to_hierarchical_dict
+from kevinbotlib_dashboard.tree import DictTreeModel
+
+
+def dump(model: DictTreeModel, parent: QModelIndex = QModelIndex()) -> dict:  # noqa: B008
+    """Fetch the whole tree and rebuild the nested dict it shows, checking the row and key indexes on the way"""
+    if model.canFetchMore(parent):
+        model.fetchMore(parent)
+    tree = {}
+    for row in range(model.rowCount(parent)):
+        index = model.index(row, 0, parent)
+        item = index.internalPointer()
+        assert item.row() == row
+        assert model.item_for_key(model.key_for_index(index)) is item
+        tree[item.key] = item.data if item.userdata is not None else dump(model, index)
+    return tree
+
+
+def random_key(rng: random.Random) -> str:
+    # Folders and topics never share a name, a topic can't also be a folder
+    folders = [f"f{rng.randrange(3)}" for _ in range(rng.randrange(3))]
+    return "/".join([*folders, f"t{rng.randrange(4)}"])
+
+
+@pytest.mark.usefixtures("qapp")
+@pytest.mark.parametrize("seed", range(50))
+def test_diffs_match_rebuilt_tree(seed: int):
+    rng = random.Random(seed)
+    topics: dict[str, dict] = {}
+    model = DictTreeModel({})
+
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.5:
+            key = random_key(rng)
+            topics[key] = {"value": str(rng.randrange(3))}
+            model.apply_diff({key: topics[key]}, [])
+        elif action < 0.8:
+            key = rng.choice(list(topics)) if topics and rng.random() < 0.8 else random_key(rng)
+            topics.pop(key, None)
+            model.apply_diff({}, [key])
+        elif action < 0.95:
+            # Expand part of the tree so diffs hit both built and pending folders
+            if topics:
+                model.fetch_path(rng.choice(list(topics)))
+        else:
+            model.update_data(to_hierarchical_dict(topics))
+
+    assert dump(model) == to_hierarchical_dict(topics)
+    assert set(model.nodes) >= set(topics)
+
+
+@pytest.mark.usefixtures("qapp")
+@pytest.mark.parametrize("seed", range(20))
+def test_update_data_matches_rebuilt_tree(seed: int):
+    rng = random.Random(seed)
+    topics: dict[str, dict] = {}
+    model = DictTreeModel({})
+
+    for _ in range(50):
+        for _ in range(rng.randrange(1, 6)):
+            topics[random_key(rng)] = {"value": str(rng.randrange(3))}
+        for key in rng.sample(list(topics), rng.randrange(len(topics) // 2 + 1)):
+            del topics[key]
+        if topics and rng.random() < 0.5:
+            model.fetch_path(rng.choice(list(topics)))
+        model.update_data(to_hierarchical_dict(topics))
+
+    assert dump(model) == to_hierarchical_dict(topics)
+
+
+@pytest.mark.usefixtures("qapp")
+def test_removing_last_topic_prunes_folders():
+    model = DictTreeModel(to_hierarchical_dict({"a/b/c": {"value": 1}, "d": {"value": 2}}))
+    model.fetch_path("a/b/c")
+
+    model.apply_diff({}, ["a/b/c"])
+
+    assert model.item_for_key("a") is None
+    assert model.item_for_key("a/b") is None
+    assert dump(model) == to_hierarchical_dict({"d": {"value": 2}})
+
+
+@pytest.mark.usefixtures("qapp")
+def test_topic_below_unfetched_folder_stays_pending():
+    model = DictTreeModel(to_hierarchical_dict({"a/b": {"value": 1}}))
+
+    model.apply_diff({"a/c/d": {"value": 2}}, [])
+
+    assert model.item_for_key("a/c/d") is None
+    assert model.canFetchMore(model.index_for_key("a"))
+    assert model.fetch_path("a/c/d").data(Qt.ItemDataRole.UserRole) == "a/c/d"
+
+
+@pytest.mark.usefixtures("qapp")
+def test_removing_pending_topic_prunes_folders():
+    model = DictTreeModel(to_hierarchical_dict({"a/b/c": {"value": 1}, "a/x": {"value": 2}}))
+
+    model.apply_diff({}, ["a/b/c"])
+
+    assert dump(model) == to_hierarchical_dict({"a/x": {"value": 2}})
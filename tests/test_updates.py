@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from kevinbotlib_dashboard.updates import FramePacer, TopicUpdateQueue
+
+
+def run_events(seconds: float):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        QCoreApplication.processEvents()
+        time.sleep(0.001)
+
+
+@pytest.mark.usefixtures("qapp")
+def test_queue_collects_keys_from_threads():
+    queue = TopicUpdateQueue()
+    notified = []
+    queue.updated.connect(lambda: notified.append(True))
+
+    threads = [threading.Thread(target=queue.mark_dirty, args=(f"key{i % 10}",)) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Signals from other threads are delivered through the event loop
+    run_events(0.01)
+
+    # Only the first change after a take notifies
+    assert len(notified) == 1
+    assert queue.take() == ({f"key{i}" for i in range(10)}, False)
+    assert queue.take() == (set(), False)
+
+    queue.mark_all()
+    run_events(0.01)
+    assert queue.take() == (set(), True)
+    assert len(notified) == 2
+
+
+@pytest.mark.usefixtures("qapp")
+def test_pacer_runs_once_per_frame():
+    calls = []
+    pacer = FramePacer(lambda: calls.append(time.monotonic()), frame_rate=20)
+
+    pacer.schedule()
+    run_events(0.01)
+    assert len(calls) == 1
+
+    # A burst right after a frame waits for the next one and runs once
+    for _ in range(10):
+        pacer.schedule()
+    run_events(0.02)
+    assert len(calls) == 1
+    run_events(0.08)
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.045